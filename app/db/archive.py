@@ -0,0 +1,323 @@
+import argparse
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import delete, select
+
+from app.db.models import ModelInput, ModelOutput
+from app.ml.features import CATEGORICAL_FEATURES, EXPECTED_FEATURES
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Répertoire racine des archives (une sous-partition par jour)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join("data", "archives"))
+
+# Âge (en jours) au-delà duquel les prédictions sont archivées
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+
+# Nombre de model_inputs déplacés (puis supprimés) par transaction
+COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "1000"))
+
+ARCHIVE_COLUMNS = [
+    "input_id",
+    "created_at",
+    *EXPECTED_FEATURES,
+    "prediction",
+    "probability",
+]
+
+PARTITION_PREFIX = "date="
+
+
+# ============================================================
+# CONVERSION LIGNES -> COLONNES TYPÉES
+# ============================================================
+
+def _history_query():
+    return (
+        select(
+            ModelInput.id,
+            ModelInput.created_at,
+            ModelInput.features,
+            ModelOutput.prediction,
+            ModelOutput.probability,
+        )
+        .outerjoin(ModelOutput, ModelOutput.input_id == ModelInput.id)
+        .order_by(ModelInput.id)
+    )
+
+
+def rows_to_frame(rows):
+    """
+    Convertit des lignes (id, created_at, features, prediction, probability)
+    en DataFrame typé, avec une colonne par feature attendue.
+
+    Parameters
+    ----------
+    rows : list[tuple]
+        Lignes issues de la jointure model_inputs / model_outputs.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame aux colonnes ``ARCHIVE_COLUMNS``.
+    """
+    features = pd.DataFrame.from_records(
+        [row[2] or {} for row in rows],
+        columns=EXPECTED_FEATURES,
+    )
+    for column in EXPECTED_FEATURES:
+        if column in CATEGORICAL_FEATURES:
+            features[column] = features[column].astype("string")
+        else:
+            features[column] = pd.to_numeric(features[column], errors="coerce")
+
+    frame = pd.DataFrame({
+        "input_id": pd.array([row[0] for row in rows], dtype="int64"),
+        "created_at": pd.to_datetime([row[1] for row in rows]),
+    })
+    frame = pd.concat([frame, features], axis=1)
+    frame["prediction"] = pd.array([row[3] for row in rows], dtype="Int8")
+    frame["probability"] = pd.array([row[4] for row in rows], dtype="Float64")
+    return frame[ARCHIVE_COLUMNS]
+
+
+# ============================================================
+# ÉCRITURE / LECTURE DES ARCHIVES
+# ============================================================
+
+def _write_partitions(frame, archive_dir):
+    written = []
+    for day, part in frame.groupby(frame["created_at"].dt.date):
+        partition = os.path.join(archive_dir, f"{PARTITION_PREFIX}{day.isoformat()}")
+        os.makedirs(partition, exist_ok=True)
+
+        # Nom déterministe : relancer un lot interrompu réécrit le même fichier
+        name = f"part-{part['input_id'].min():010d}-{part['input_id'].max():010d}.parquet"
+        path = os.path.join(partition, name)
+        tmp_path = path + ".tmp"
+        part.to_parquet(tmp_path, index=False, compression="zstd")
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+def compact(
+    db,
+    older_than_days=RETENTION_DAYS,
+    batch_size=COMPACTION_BATCH_SIZE,
+    archive_dir=ARCHIVE_DIR,
+):
+    """
+    Déplace les prédictions anciennes vers des archives Parquet.
+
+    Les lignes de ``model_inputs`` (et leurs ``model_outputs``) plus
+    anciennes que ``older_than_days`` sont écrites dans des fichiers
+    Parquet partitionnés par jour, puis supprimées des tables vivantes
+    par lots de ``batch_size``. Chaque lot est écrit sur disque avant
+    d'être supprimé et validé dans sa propre transaction.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    older_than_days : int, optional
+        Âge minimal des lignes à archiver, par défaut ``RETENTION_DAYS``.
+    batch_size : int, optional
+        Nombre de model_inputs par lot, par défaut ``COMPACTION_BATCH_SIZE``.
+    archive_dir : str, optional
+        Répertoire racine des archives, par défaut ``ARCHIVE_DIR``.
+
+    Returns
+    -------
+    int
+        Nombre de model_inputs archivés.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    archived = 0
+
+    while True:
+        ids = db.scalars(
+            select(ModelInput.id)
+            .where(ModelInput.created_at < cutoff)
+            .order_by(ModelInput.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            return archived
+
+        rows = db.execute(_history_query().where(ModelInput.id.in_(ids))).all()
+        _write_partitions(rows_to_frame(rows), archive_dir)
+
+        db.execute(delete(ModelOutput).where(ModelOutput.input_id.in_(ids)))
+        db.execute(delete(ModelInput).where(ModelInput.id.in_(ids)))
+        db.commit()
+        archived += len(ids)
+
+
+def _partition_date(name):
+    try:
+        return date.fromisoformat(name[len(PARTITION_PREFIX):])
+    except ValueError:
+        return None
+
+
+def _archive_files(archive_dir, start=None, end=None):
+    files = []
+    if os.path.isdir(archive_dir):
+        for name in sorted(os.listdir(archive_dir)):
+            day = _partition_date(name) if name.startswith(PARTITION_PREFIX) else None
+            if day is None:
+                continue
+            if start is not None and day < start.date():
+                continue
+            if end is not None and day > end.date():
+                continue
+            partition = os.path.join(archive_dir, name)
+            files.extend(
+                os.path.join(partition, f)
+                for f in sorted(os.listdir(partition))
+                if f.endswith(".parquet")
+            )
+    return files
+
+
+def read_archives(archive_dir=ARCHIVE_DIR, start=None, end=None):
+    """
+    Lit les archives Parquet, en ne chargeant que les partitions utiles.
+
+    Parameters
+    ----------
+    archive_dir : str, optional
+        Répertoire racine des archives, par défaut ``ARCHIVE_DIR``.
+    start, end : datetime, optional
+        Bornes (incluse / exclue) sur ``created_at``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame aux colonnes ``ARCHIVE_COLUMNS``.
+    """
+    files = _archive_files(archive_dir, start, end)
+    if not files:
+        return rows_to_frame([])
+
+    frame = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    return _filter_dates(frame, start, end)
+
+
+def _filter_dates(frame, start, end):
+    if start is not None:
+        frame = frame[frame["created_at"] >= _naive(start)]
+    if end is not None:
+        frame = frame[frame["created_at"] < _naive(end)]
+    return frame.reset_index(drop=True)
+
+
+def _naive(moment):
+    # created_at est stocké sans fuseau (UTC)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return pd.Timestamp(moment)
+
+
+def read_history(db, start=None, end=None, archive_dir=ARCHIVE_DIR):
+    """
+    Historique complet des prédictions : archives + tables vivantes.
+
+    Point d'entrée unique pour l'historique et l'analyse de dérive :
+    l'appelant n'a pas à savoir si une ligne a déjà été compactée.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    start, end : datetime, optional
+        Bornes (incluse / exclue) sur ``created_at``.
+    archive_dir : str, optional
+        Répertoire racine des archives, par défaut ``ARCHIVE_DIR``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame aux colonnes ``ARCHIVE_COLUMNS``, trié par ``created_at``.
+    """
+    query = _history_query()
+    if start is not None:
+        query = query.where(ModelInput.created_at >= start)
+    if end is not None:
+        query = query.where(ModelInput.created_at < end)
+    live = rows_to_frame(db.execute(query).all())
+
+    archived = read_archives(archive_dir, start, end)
+    frames = [f for f in (archived, live) if not f.empty]
+    if not frames:
+        return live
+
+    history = pd.concat(frames, ignore_index=True)
+    return history.sort_values(["created_at", "input_id"], ignore_index=True)
+
+
+def iter_history(db, archive_dir=ARCHIVE_DIR, batch_size=COMPACTION_BATCH_SIZE):
+    """
+    Parcourt l'historique complet (archives + tables vivantes) par morceaux.
+
+    Contrairement à ``read_history``, l'historique n'est jamais chargé en
+    entier : chaque fichier d'archive, puis chaque page de ``batch_size``
+    model_inputs des tables vivantes, est produit séparément. Les
+    morceaux ne sont pas triés entre eux par ``created_at``.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    archive_dir : str, optional
+        Répertoire racine des archives, par défaut ``ARCHIVE_DIR``.
+    batch_size : int, optional
+        Nombre de model_inputs par page, par défaut ``COMPACTION_BATCH_SIZE``.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Morceau aux colonnes ``ARCHIVE_COLUMNS``.
+    """
+    for path in _archive_files(archive_dir):
+        yield pd.read_parquet(path)
+
+    last_id = None
+    while True:
+        query = select(ModelInput.id).order_by(ModelInput.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(ModelInput.id > last_id)
+        ids = db.scalars(query).all()
+        if not ids:
+            return
+        last_id = ids[-1]
+        yield rows_to_frame(db.execute(_history_query().where(ModelInput.id.in_(ids))).all())
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Archive les prédictions anciennes en Parquet partitionné par jour."
+    )
+    parser.add_argument("--older-than-days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = compact(db, args.older_than_days, args.batch_size, args.archive_dir)
+    finally:
+        db.close()
+    print(f"{count} model_inputs archivés dans {args.archive_dir}")
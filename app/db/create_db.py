@@ -1,9 +1,5 @@
-from sqlalchemy import create_engine
 from app.db.models import Base
-
-DATABASE_URL = "postgresql://adamakeb@localhost:5432/ml_api_db"
-
-engine = create_engine(DATABASE_URL)
+from app.db.session import get_engine
 
 if __name__ == "__main__":
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine())
@@ -2,9 +2,12 @@ from sqlalchemy import (
     Column,
     Integer,
     Float,
+    String,
+    Date,
     DateTime,
     ForeignKey,
-    CheckConstraint
+    CheckConstraint,
+    Index
 )
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import declarative_base, relationship, validates
@@ -20,7 +23,7 @@ class ModelInput(Base):
     # Données envoyées au modèle
     features = Column(JSON, nullable=False)
 
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Relation ORM
     outputs = relationship(
@@ -271,6 +274,28 @@ class ModelInput(Base):
 
 
 
+def check_features(features):
+    """
+    Applique les règles de validation de ``ModelInput`` sans créer d'objet ORM.
+
+    Parameters
+    ----------
+    features : dict
+        Dictionnaire des features à valider.
+
+    Returns
+    -------
+    dict
+        Le même dictionnaire s'il est valide.
+
+    Raises
+    ------
+    ValueError
+        Si une règle de validation est violée.
+    """
+    return ModelInput.validate_features(None, "features", features)
+
+
 class ModelOutput(Base):
     __tablename__ = "model_outputs"
 
@@ -288,7 +313,7 @@ class ModelOutput(Base):
     # Probabilité associée
     probability = Column(Float)
 
-    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     input = relationship("ModelInput", back_populates="outputs")
 
@@ -303,3 +328,87 @@ class ModelOutput(Base):
             name="check_probability_range"
         ),
     )
+
+
+class EmployeeScore(Base):
+    __tablename__ = "employee_scores"
+
+    # Identifiant fourni par le client (employee_id)
+    employee_id = Column(String(64), primary_key=True)
+
+    # Dernières features connues de l'employé
+    features = Column(JSON, nullable=False)
+
+    # Empreinte des features effectivement scorées
+    features_hash = Column(String(64), nullable=False)
+
+    # Version du modèle ayant produit le score
+    model_version = Column(String(32), nullable=False)
+
+    prediction = Column(Integer, nullable=False)
+
+    probability = Column(Float)
+
+    scored_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    # -------- RÈGLES ORM SQL (CONTRAINTES DB) --------
+    __table_args__ = (
+        CheckConstraint(
+            "prediction IN (0, 1)",
+            name="check_score_prediction_binary"
+        ),
+        CheckConstraint(
+            "probability IS NULL OR (probability >= 0 AND probability <= 1)",
+            name="check_score_probability_range"
+        ),
+    )
+
+
+class PredictionRollup(Base):
+    __tablename__ = "prediction_rollups"
+
+    # Dimension agrégée (ex. "departement") et sa valeur
+    dimension = Column(String(64), primary_key=True)
+    value = Column(String(255), primary_key=True)
+
+    # Jour (UTC) des prédictions agrégées ; ALL_TIME_BUCKET (date.min)
+    # pour le total de tout l'historique
+    bucket = Column(Date, primary_key=True)
+
+    # Nombre de prédictions et de prédictions positives (churn)
+    count = Column(Integer, nullable=False, default=0)
+    positives = Column(Integer, nullable=False, default=0)
+
+    # Prédictions avec probabilité (hors mode "decision only")
+    scored = Column(Integer, nullable=False, default=0)
+    probability_sum = Column(Float, nullable=False, default=0.0)
+
+    # Effectifs par intervalle de probabilité (ROLLUP_HISTOGRAM_BINS)
+    histogram = Column(JSON, nullable=False)
+
+    # -------- RÈGLES ORM SQL (CONTRAINTES DB) --------
+    __table_args__ = (
+        CheckConstraint(
+            "positives >= 0 AND positives <= count",
+            name="check_rollup_positives"
+        ),
+        CheckConstraint(
+            "scored >= 0 AND scored <= count",
+            name="check_rollup_scored"
+        ),
+        # Lecture d'un jour (ou du total ALL_TIME_BUCKET) pour une dimension
+        Index("ix_rollup_dimension_bucket", "dimension", "bucket"),
+    )
+
+
+class ReplayedSegment(Base):
+    __tablename__ = "replayed_segments"
+
+    # Nom du segment du journal local, chargé dans la même transaction
+    name = Column(String(255), primary_key=True)
+
+    # Enregistrements chargés / écartés (dead letter)
+    records = Column(Integer, nullable=False)
+    rejected = Column(Integer, nullable=False, default=0)
+
+    replayed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,522 @@
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.db.models import ModelInput, ModelOutput, ReplayedSegment
+from app.db.rollups import update_rollups
+from app.db.scores import record_scores
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Backend de persistance : "sql" (écriture directe) ou "segment_log"
+PERSISTENCE_BACKEND = os.getenv("PERSISTENCE_BACKEND", "sql")
+
+# Répertoire des segments du journal local
+SEGMENT_DIR = os.getenv("SEGMENT_DIR", os.path.join("data", "segments"))
+
+# Taille (octets) au-delà de laquelle le segment courant est scellé
+SEGMENT_MAX_BYTES = int(os.getenv("SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Fenêtre (ms) de regroupement des écritures avant un fsync commun
+SEGMENT_GROUP_COMMIT_MS = float(os.getenv("SEGMENT_GROUP_COMMIT_MS", "2"))
+
+# Suffixes des segments : en cours d'écriture / scellé (rejouable)
+OPEN_SUFFIX = ".log.open"
+SEALED_SUFFIX = ".log"
+
+# Suffixe des enregistrements écartés au rejeu (dead letter)
+DEAD_LETTER_SUFFIX = ".dead"
+
+# Erreurs propres à un enregistrement : le rejouer échouerait toujours
+RECORD_ERRORS = (KeyError, TypeError, ValueError, DataError, IntegrityError)
+
+
+# ============================================================
+# ENREGISTREMENTS
+# ============================================================
+
+def prediction_record(features, prediction, probability, employee_id=None, model_version=None):
+    """
+    Construit l'enregistrement persisté pour une prédiction.
+
+    Parameters
+    ----------
+    features : dict
+        Features complètes envoyées au modèle.
+    prediction : int
+        Prédiction (0 ou 1).
+    probability : float
+        Probabilité de la classe positive.
+    employee_id : str, optional
+        Identifiant de l'employé (alimente ``employee_scores``).
+    model_version : str, optional
+        Version du modèle ayant produit le score.
+
+    Returns
+    -------
+    dict
+        Enregistrement sérialisable en JSON.
+    """
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "features": features,
+        "prediction": prediction,
+        "probability": probability,
+        "employee_id": employee_id,
+        "model_version": model_version,
+    }
+
+
+# ============================================================
+# BACKEND SQL
+# ============================================================
+
+class SqlBackend:
+    """
+    Persistance directe dans ``model_inputs`` / ``model_outputs``
+    (et ``employee_scores`` pour les enregistrements identifiés). Les
+    agrégats ``prediction_rollups`` sont mis à jour dans la même
+    transaction.
+    """
+
+    def save(self, db, records, commit=True):
+        """
+        Écrit un lot d'enregistrements en une transaction.
+
+        Parameters
+        ----------
+        db : Session
+            Session SQLAlchemy.
+        records : list[dict]
+            Enregistrements produits par ``prediction_record``.
+        commit : bool, optional
+            Valide la transaction (un seul commit), par défaut True ; False
+            laisse les écritures en attente dans la transaction courante.
+
+        Raises
+        ------
+        ValueError
+            Si les features d'un enregistrement sont invalides.
+        """
+        model_inputs = [
+            ModelInput(
+                features=record["features"],
+                created_at=datetime.fromisoformat(record["created_at"]),
+            )
+            for record in records
+        ]
+        db.add_all(model_inputs)
+        db.flush()
+
+        db.add_all([
+            ModelOutput(
+                input_id=model_input.id,
+                prediction=record["prediction"],
+                probability=record["probability"],
+                created_at=model_input.created_at,
+            )
+            for model_input, record in zip(model_inputs, records)
+        ])
+        update_rollups(db, records)
+
+        identified = [r for r in records if r.get("employee_id") is not None]
+        for model_version in {r["model_version"] for r in identified}:
+            group = [r for r in identified if r["model_version"] == model_version]
+            record_scores(
+                db,
+                [r["employee_id"] for r in group],
+                [r["features"] for r in group],
+                [r["prediction"] for r in group],
+                [r["probability"] for r in group],
+                model_version,
+                persist=True,
+                commit=False,
+            )
+        if commit:
+            db.commit()
+
+    def close(self):
+        pass
+
+
+# ============================================================
+# BACKEND JOURNAL DE SEGMENTS
+# ============================================================
+
+class SegmentLogBackend:
+    """
+    Journal local en ajout seul, découpé en segments.
+
+    Chaque enregistrement est ajouté (une ligne JSON) au segment courant.
+    Un thread de fond regroupe les écritures concurrentes et les rend
+    durables par un seul ``fsync`` (group commit) : ``save`` ne rend la
+    main qu'une fois ses lignes sur disque. Au-delà de ``max_bytes`` le
+    segment est scellé (``.log``) et un nouveau est ouvert ; les segments
+    scellés sont rejoués en base par ``replay_segments``.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Répertoire des segments, par défaut ``SEGMENT_DIR``.
+    max_bytes : int, optional
+        Taille de rotation, par défaut ``SEGMENT_MAX_BYTES``.
+    group_commit_ms : float, optional
+        Fenêtre de regroupement, par défaut ``SEGMENT_GROUP_COMMIT_MS``.
+    """
+
+    def __init__(
+        self,
+        directory=SEGMENT_DIR,
+        max_bytes=SEGMENT_MAX_BYTES,
+        group_commit_ms=SEGMENT_GROUP_COMMIT_MS,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.group_commit_ms = group_commit_ms
+        os.makedirs(directory, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._written_seq = 0
+        self._synced_seq = 0
+        self._closing = False
+        self._error = None
+        self._segment_index = 0
+        self._open_segment()
+
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    # ---------- SEGMENTS ----------
+    def _open_segment(self):
+        # Nom unique par processus : plusieurs workers peuvent partager le répertoire
+        self._segment_index += 1
+        name = f"segment-{time.time_ns():020d}-{os.getpid()}-{self._segment_index:06d}"
+        self._path = os.path.join(self.directory, name + OPEN_SUFFIX)
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = 0
+
+    def _seal_segment(self):
+        os.close(self._fd)
+        sealed = self._path[: -len(OPEN_SUFFIX)] + SEALED_SUFFIX
+        if self._size:
+            os.replace(self._path, sealed)
+        else:
+            os.remove(self._path)
+
+    # ---------- GROUP COMMIT ----------
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._written_seq == self._synced_seq and not self._closing:
+                    self._cond.wait()
+                if self._written_seq == self._synced_seq:
+                    return
+
+            # Laisse d'autres écritures rejoindre le même fsync
+            if self.group_commit_ms > 0:
+                time.sleep(self.group_commit_ms / 1000)
+
+            with self._cond:
+                target = self._written_seq
+                fd = self._fd
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._synced_seq = target
+                # Rotation seulement si tout le segment courant est durable
+                if self._size >= self.max_bytes and self._written_seq == target:
+                    self._seal_segment()
+                    self._open_segment()
+                self._cond.notify_all()
+
+    def save(self, db, records):
+        """
+        Ajoute un lot d'enregistrements au journal et attend leur fsync.
+
+        Parameters
+        ----------
+        db : Session
+            Inutilisée (la base n'est pas contactée).
+        records : list[dict]
+            Enregistrements produits par ``prediction_record``.
+
+        Raises
+        ------
+        ValueError
+            Si les features d'un enregistrement sont invalides.
+        OSError
+            Si l'écriture ou le fsync du journal échoue.
+        """
+        # Mêmes validations que l'écriture en base
+        for record in records:
+            ModelInput(features=record["features"])
+
+        data = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        ).encode()
+
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            if self._closing:
+                raise RuntimeError("Journal de segments fermé")
+            os.write(self._fd, data)
+            self._size += len(data)
+            self._written_seq += 1
+            seq = self._written_seq
+            self._cond.notify_all()
+
+            while self._synced_seq < seq and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+
+    def close(self):
+        """
+        Rend durables les écritures en attente et scelle le segment courant.
+        """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._cond:
+            self._seal_segment()
+
+
+# ============================================================
+# SÉLECTION DU BACKEND
+# ============================================================
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Retourne le backend de persistance configuré (créé au premier appel).
+
+    Returns
+    -------
+    SqlBackend | SegmentLogBackend
+        Backend choisi par ``PERSISTENCE_BACKEND``.
+
+    Raises
+    ------
+    ValueError
+        Si ``PERSISTENCE_BACKEND`` est inconnu.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if PERSISTENCE_BACKEND == "sql":
+                _backend = SqlBackend()
+            elif PERSISTENCE_BACKEND == "segment_log":
+                _backend = SegmentLogBackend()
+            else:
+                raise ValueError(f"PERSISTENCE_BACKEND inconnu : {PERSISTENCE_BACKEND}")
+        return _backend
+
+
+def close_backend():
+    """
+    Ferme le backend de persistance s'il a été créé.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+
+
+# ============================================================
+# REJEU DES SEGMENTS
+# ============================================================
+
+def read_segment(path):
+    """
+    Lit les enregistrements d'un segment.
+
+    Une dernière ligne tronquée (arrêt brutal pendant une écriture non
+    encore durable) est ignorée.
+
+    Parameters
+    ----------
+    path : str
+        Chemin du segment.
+
+    Returns
+    -------
+    list[dict]
+        Enregistrements, dans l'ordre d'écriture.
+    """
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            records.append(json.loads(line))
+    return records
+
+
+def _segment_stem(name):
+    for suffix in (OPEN_SUFFIX, SEALED_SUFFIX):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _write_dead_letters(path, rejected):
+    # Réécrit en entier : un rejeu interrompu puis relancé produit le même fichier
+    with open(path, "w", encoding="utf-8") as f:
+        for record, error in rejected:
+            f.write(json.dumps({"error": error, "record": record}, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _load_segment(db, backend, records, batch_size):
+    """
+    Écrit les enregistrements d'un segment dans la transaction courante
+    (sans commit) et retourne ceux qui ne peuvent pas être chargés.
+    """
+    rejected = []
+    valid = []
+    for record in records:
+        try:
+            ModelInput(features=record["features"])
+        except RECORD_ERRORS as e:
+            rejected.append((record, f"{type(e).__name__}: {e}"))
+        else:
+            valid.append(record)
+
+    try:
+        for start in range(0, len(valid), batch_size):
+            backend.save(db, valid[start:start + batch_size], commit=False)
+            # Lignes envoyées à la base : la session n'a plus à les suivre
+            db.flush()
+            db.expunge_all()
+        return rejected
+    except RECORD_ERRORS:
+        db.rollback()
+
+    # Lot refusé par la base : chargement un à un pour isoler les rejets
+    for record in valid:
+        try:
+            with db.begin_nested():
+                backend.save(db, [record], commit=False)
+        except RECORD_ERRORS as e:
+            rejected.append((record, f"{type(e).__name__}: {e}"))
+    return rejected
+
+
+def replay_segments(db, directory=SEGMENT_DIR, batch_size=1000, include_open=False):
+    """
+    Charge les segments scellés en base puis les supprime.
+
+    Chaque segment est chargé en une transaction, qui enregistre aussi son
+    nom dans ``replayed_segments`` : un rejeu interrompu (avant ou après
+    le commit) peut être relancé sans doublon. Les enregistrements qui ne
+    pourront jamais être chargés (features invalides, contrainte violée)
+    sont écartés dans ``<segment>.dead`` (une ligne JSON ``error`` /
+    ``record``) au lieu de bloquer le segment.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    directory : str, optional
+        Répertoire des segments, par défaut ``SEGMENT_DIR``.
+    batch_size : int, optional
+        Nombre d'enregistrements envoyés à la base par passe (borne la
+        mémoire de la session), par défaut 1000.
+    include_open : bool, optional
+        Rejoue aussi les segments ``.log.open`` laissés par un processus
+        arrêté, par défaut False. À n'utiliser que si aucun processus
+        n'écrit dans ``directory``.
+
+    Returns
+    -------
+    int
+        Nombre d'enregistrements chargés.
+
+    Raises
+    ------
+    sqlalchemy.exc.SQLAlchemyError
+        Si la base est indisponible : la transaction du segment est
+        annulée et le segment conservé pour le prochain rejeu.
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    suffixes = (SEALED_SUFFIX, OPEN_SUFFIX) if include_open else (SEALED_SUFFIX,)
+    segments = sorted(
+        name for name in os.listdir(directory) if name.endswith(suffixes)
+    )
+
+    backend = SqlBackend()
+    loaded = 0
+    for name in segments:
+        path = os.path.join(directory, name)
+        if db.get(ReplayedSegment, name) is not None:
+            # Déjà chargé : le processus s'est arrêté avant la suppression
+            os.remove(path)
+            continue
+
+        records = read_segment(path)
+        try:
+            rejected = _load_segment(db, backend, records, batch_size)
+            if rejected:
+                _write_dead_letters(
+                    os.path.join(directory, _segment_stem(name) + DEAD_LETTER_SUFFIX), rejected
+                )
+            db.add(ReplayedSegment(
+                name=name,
+                records=len(records) - len(rejected),
+                rejected=len(rejected),
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        os.remove(path)
+        loaded += len(records) - len(rejected)
+    return loaded
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Rejoue en base les segments du journal local."
+    )
+    parser.add_argument("--segment-dir", default=SEGMENT_DIR)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--include-open", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = replay_segments(db, args.segment_dir, args.batch_size, args.include_open)
+    finally:
+        db.close()
+    print(f"{count} enregistrements rejoués depuis {args.segment_dir}")
@@ -0,0 +1,328 @@
+import argparse
+import os
+from datetime import date, datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.db.models import PredictionRollup
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Features agrégées (séparées par des virgules)
+ROLLUP_DIMENSIONS = [
+    dimension.strip()
+    for dimension in os.getenv("ROLLUP_DIMENSIONS", "departement,poste").split(",")
+    if dimension.strip()
+]
+
+# Nombre d'intervalles de l'histogramme des probabilités sur [0, 1]
+ROLLUP_HISTOGRAM_BINS = int(os.getenv("ROLLUP_HISTOGRAM_BINS", "10"))
+
+# Nombre d'enregistrements relus par lot lors d'une reconstruction
+ROLLUP_REBUILD_BATCH_SIZE = 10000
+
+# Jour sentinelle des lignes "tout l'historique" (une par dimension, valeur)
+ALL_TIME_BUCKET = date.min
+
+
+# ============================================================
+# AGRÉGATION D'UN LOT
+# ============================================================
+
+def _bucket(created_at):
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.date()
+
+
+def _histogram_bin(probability, bins):
+    return min(int(probability * bins), bins - 1)
+
+
+def aggregate(records, dimensions=None, bins=ROLLUP_HISTOGRAM_BINS):
+    """
+    Agrège un lot d'enregistrements par (dimension, valeur, jour).
+
+    Parameters
+    ----------
+    records : list[dict]
+        Enregistrements produits par ``prediction_record``.
+    dimensions : list[str], optional
+        Features agrégées, par défaut ``ROLLUP_DIMENSIONS``.
+    bins : int, optional
+        Nombre d'intervalles de l'histogramme, par défaut
+        ``ROLLUP_HISTOGRAM_BINS``.
+
+    Returns
+    -------
+    dict
+        {(dimension, valeur, jour): compteurs} ; les compteurs sont
+        ``count``, ``positives``, ``scored``, ``probability_sum`` et
+        ``histogram``. Une probabilité None (mode "decision only") n'est
+        comptée que dans ``count`` / ``positives``.
+    """
+    if dimensions is None:
+        dimensions = ROLLUP_DIMENSIONS
+
+    groups = {}
+    for record in records:
+        bucket = _bucket(record["created_at"])
+        probability = record["probability"]
+        for dimension in dimensions:
+            value = record["features"].get(dimension)
+            if value is None:
+                continue
+            key = (dimension, str(value), bucket)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {
+                    "count": 0,
+                    "positives": 0,
+                    "scored": 0,
+                    "probability_sum": 0.0,
+                    "histogram": [0] * bins,
+                }
+            group["count"] += 1
+            group["positives"] += int(record["prediction"] == 1)
+            if probability is not None:
+                group["scored"] += 1
+                group["probability_sum"] += probability
+                group["histogram"][_histogram_bin(probability, bins)] += 1
+    return groups
+
+
+# ============================================================
+# MISE À JOUR INCRÉMENTALE
+# ============================================================
+
+def _add(rollup, group):
+    rollup.count += group["count"]
+    rollup.positives += group["positives"]
+    rollup.scored += group["scored"]
+    rollup.probability_sum += group["probability_sum"]
+    rollup.histogram = [a + b for a, b in zip(rollup.histogram, group["histogram"])]
+
+
+def _with_all_time(groups):
+    totals = {}
+    for (dimension, value, _), group in groups.items():
+        total = totals.get((dimension, value, ALL_TIME_BUCKET))
+        if total is None:
+            totals[(dimension, value, ALL_TIME_BUCKET)] = {
+                **group, "histogram": list(group["histogram"])
+            }
+            continue
+        for key in ("count", "positives", "scored", "probability_sum"):
+            total[key] += group[key]
+        total["histogram"] = [a + b for a, b in zip(total["histogram"], group["histogram"])]
+    return {**groups, **totals}
+
+
+def update_rollups(db, records, dimensions=None):
+    """
+    Ajoute un lot d'enregistrements aux agrégats (sans commit).
+
+    Le lot est d'abord agrégé en mémoire : une seule ligne de
+    ``prediction_rollups`` est lue puis mise à jour par (dimension,
+    valeur, jour), plus une par (dimension, valeur) pour le total de tout
+    l'historique (jour ``ALL_TIME_BUCKET``), quelle que soit la taille du
+    lot. Les lignes existantes
+    sont verrouillées (``SELECT ... FOR UPDATE``) ; une création
+    concurrente de la même ligne est rattrapée par une mise à jour.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy (la transaction de l'appelant est utilisée).
+    records : list[dict]
+        Enregistrements produits par ``prediction_record``.
+    dimensions : list[str], optional
+        Features agrégées, par défaut ``ROLLUP_DIMENSIONS``.
+    """
+    groups = _with_all_time(aggregate(records, dimensions))
+    for (dimension, value, bucket), group in sorted(groups.items()):
+        query = (
+            select(PredictionRollup)
+            .where(
+                PredictionRollup.dimension == dimension,
+                PredictionRollup.value == value,
+                PredictionRollup.bucket == bucket,
+            )
+            .with_for_update()
+        )
+        rollup = db.scalars(query).first()
+        if rollup is not None:
+            _add(rollup, group)
+            continue
+
+        try:
+            with db.begin_nested():
+                db.add(PredictionRollup(dimension=dimension, value=value, bucket=bucket, **group))
+        except IntegrityError:
+            _add(db.scalars(query).one(), group)
+    db.flush()
+
+
+# ============================================================
+# LECTURE
+# ============================================================
+
+def read_rollups(db, dimension, start=None, end=None, daily=False):
+    """
+    Statistiques d'une dimension sur une période.
+
+    Seules les lignes de ``prediction_rollups`` sont lues, jamais les
+    prédictions. Sans bornes ni ``daily``, seules les lignes "tout
+    l'historique" sont lues : le coût ne dépend que du nombre de valeurs.
+    Sinon il est proportionnel au nombre de valeurs × jours de la période.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    dimension : str
+        Feature agrégée (doit figurer dans ``ROLLUP_DIMENSIONS``).
+    start, end : date, optional
+        Bornes incluses sur le jour.
+    daily : bool, optional
+        Un groupe par (valeur, jour) plutôt que par valeur, par défaut False.
+
+    Returns
+    -------
+    list[dict]
+        Groupes triés par valeur (puis jour) : ``value``, ``bucket`` (None
+        si ``daily`` est False), ``count``, ``positives``, ``churn_rate``,
+        ``mean_probability`` et ``histogram``.
+    """
+    query = select(PredictionRollup).where(PredictionRollup.dimension == dimension)
+    if start is None and end is None and not daily:
+        query = query.where(PredictionRollup.bucket == ALL_TIME_BUCKET)
+    else:
+        query = query.where(PredictionRollup.bucket > ALL_TIME_BUCKET)
+    if start is not None:
+        query = query.where(PredictionRollup.bucket >= start)
+    if end is not None:
+        query = query.where(PredictionRollup.bucket <= end)
+    query = query.order_by(PredictionRollup.value, PredictionRollup.bucket)
+
+    groups = {}
+    for rollup in db.scalars(query):
+        key = (rollup.value, rollup.bucket if daily else None)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "count": 0,
+                "positives": 0,
+                "scored": 0,
+                "probability_sum": 0.0,
+                "histogram": [0] * len(rollup.histogram),
+            }
+        group["count"] += rollup.count
+        group["positives"] += rollup.positives
+        group["scored"] += rollup.scored
+        group["probability_sum"] += rollup.probability_sum
+        group["histogram"] = [a + b for a, b in zip(group["histogram"], rollup.histogram)]
+
+    return [
+        {
+            "value": value,
+            "bucket": bucket,
+            "count": group["count"],
+            "positives": group["positives"],
+            "churn_rate": group["positives"] / group["count"] if group["count"] else None,
+            "mean_probability": (
+                group["probability_sum"] / group["scored"] if group["scored"] else None
+            ),
+            "histogram": group["histogram"],
+        }
+        for (value, bucket), group in groups.items()
+    ]
+
+
+# ============================================================
+# RECONSTRUCTION
+# ============================================================
+
+def _frame_records(frame, dimensions):
+    frame = frame[frame["prediction"].notna()]
+    features = frame[dimensions].astype(object).where(frame[dimensions].notna(), None)
+    return [
+        {
+            "created_at": created_at.to_pydatetime(),
+            "features": row,
+            "prediction": int(prediction),
+            "probability": None if probability is None else float(probability),
+        }
+        for created_at, row, prediction, probability in zip(
+            frame["created_at"],
+            features.to_dict("records"),
+            frame["prediction"],
+            frame["probability"].astype(object).where(frame["probability"].notna(), None),
+        )
+    ]
+
+
+def rebuild_rollups(db, archive_dir=None, batch_size=ROLLUP_REBUILD_BATCH_SIZE):
+    """
+    Recalcule tous les agrégats depuis l'historique complet.
+
+    À lancer après un changement de ``ROLLUP_DIMENSIONS`` ou de
+    ``ROLLUP_HISTOGRAM_BINS`` : l'historique est parcouru par morceaux
+    (fichiers d'archive puis pages des tables vivantes, voir
+    ``iter_history``), sans jamais être chargé en entier, et les agrégats
+    sont réécrits en une transaction.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    archive_dir : str, optional
+        Répertoire racine des archives, par défaut ``ARCHIVE_DIR``.
+    batch_size : int, optional
+        Nombre d'enregistrements agrégés par passe, par défaut
+        ``ROLLUP_REBUILD_BATCH_SIZE``.
+
+    Returns
+    -------
+    int
+        Nombre de prédictions agrégées.
+    """
+    from app.db.archive import ARCHIVE_COLUMNS, ARCHIVE_DIR, iter_history
+
+    dimensions = [d for d in ROLLUP_DIMENSIONS if d in ARCHIVE_COLUMNS]
+
+    db.execute(delete(PredictionRollup))
+    count = 0
+    for frame in iter_history(db, archive_dir=archive_dir or ARCHIVE_DIR, batch_size=batch_size):
+        for start in range(0, len(frame), batch_size):
+            records = _frame_records(frame.iloc[start:start + batch_size], dimensions)
+            update_rollups(db, records, dimensions)
+            count += len(records)
+    db.commit()
+    return count
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        description="Reconstruit prediction_rollups depuis l'historique complet."
+    )
+    parser.add_argument("--archive-dir", default=None)
+    parser.add_argument("--batch-size", type=int, default=ROLLUP_REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = rebuild_rollups(db, args.archive_dir, args.batch_size)
+    finally:
+        db.close()
+    print(f"{count} prédictions agrégées")
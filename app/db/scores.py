@@ -0,0 +1,254 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.db.models import EmployeeScore
+from app.ml.inference import predict_positive_proba
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Nombre maximal de scores gardés dans l'index mémoire (LRU)
+SCORE_INDEX_MAX_ENTRIES = int(os.getenv("SCORE_INDEX_MAX_ENTRIES", "100000"))
+
+# Nombre d'entrées relues par lot par le job de rescoring
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "1000"))
+
+
+# ============================================================
+# INDEX MÉMOIRE
+# ============================================================
+
+def features_hash(features):
+    """
+    Empreinte stable d'un dictionnaire de features.
+
+    Parameters
+    ----------
+    features : dict
+        Features d'un employé.
+
+    Returns
+    -------
+    str
+        Empreinte SHA-256 hexadécimale.
+    """
+    payload = json.dumps(features, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ScoreIndex:
+    """
+    Index mémoire LRU des derniers scores par employee_id.
+
+    Seul le score est conservé (pas les features) pour garder une
+    empreinte mémoire faible ; les features restent dans la table
+    ``employee_scores``.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Taille maximale de l'index, par défaut ``SCORE_INDEX_MAX_ENTRIES``.
+    """
+
+    def __init__(self, max_entries=SCORE_INDEX_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, employee_id):
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is not None:
+                self._entries.move_to_end(employee_id)
+            return entry
+
+    def put(self, employee_id, entry):
+        with self._lock:
+            self._entries[employee_id] = entry
+            self._entries.move_to_end(employee_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+score_index = ScoreIndex()
+
+
+# ============================================================
+# TABLE DES SCORES
+# ============================================================
+
+def score_entry(score):
+    """
+    Convertit une ligne ``EmployeeScore`` en entrée d'index.
+
+    Parameters
+    ----------
+    score : EmployeeScore
+        Ligne de la table des scores.
+
+    Returns
+    -------
+    dict
+        Entrée d'index (sans les features).
+    """
+    return {
+        "employee_id": score.employee_id,
+        "prediction": score.prediction,
+        "probability": score.probability,
+        "model_version": score.model_version,
+        "features_hash": score.features_hash,
+        "scored_at": score.scored_at,
+    }
+
+
+def is_fresh(entry, model_version):
+    """
+    Indique si un score a été produit par la version courante du modèle.
+    """
+    return entry["model_version"] == model_version
+
+
+def record_scores(
+    db, employee_ids, rows, predictions, probabilities, model_version, persist=True, commit=True
+):
+    """
+    Enregistre les derniers scores d'employés (index + table).
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    employee_ids : list[str]
+        Identifiants ; les lignes dont l'identifiant est None sont ignorées.
+    rows : list[dict]
+        Features scorées, dans l'ordre de ``employee_ids``.
+    predictions : list[int]
+        Prédictions, dans l'ordre de ``employee_ids``.
+    probabilities : list[float]
+        Probabilités, dans l'ordre de ``employee_ids``.
+    model_version : str
+        Version du modèle ayant produit les scores.
+    persist : bool, optional
+        Écrit aussi dans ``employee_scores``, par défaut True.
+    commit : bool, optional
+        Valide la transaction après l'écriture, par défaut True ; False
+        laisse le commit à l'appelant.
+    """
+    scored_at = datetime.now(timezone.utc)
+    for employee_id, features, prediction, probability in zip(
+        employee_ids, rows, predictions, probabilities
+    ):
+        if employee_id is None:
+            continue
+        score = EmployeeScore(
+            employee_id=employee_id,
+            features=features,
+            features_hash=features_hash(features),
+            model_version=model_version,
+            prediction=prediction,
+            probability=probability,
+            scored_at=scored_at,
+        )
+        score_index.put(employee_id, score_entry(score))
+        if persist:
+            db.merge(score)
+    if persist and commit:
+        db.commit()
+
+
+def rescore_stale(db, model, model_version, batch_size=RESCORE_BATCH_SIZE):
+    """
+    Recalcule les scores obsolètes de la table ``employee_scores``.
+
+    Une entrée est obsolète si elle a été produite par une autre version
+    du modèle (les features stockées sont toujours celles du dernier
+    score). Seules les entrées obsolètes sont parcourues, par lots de
+    ``batch_size`` (ordre de clé), et chaque lot est rescoré en un seul
+    appel vectorisé.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    model : object
+        Modèle chargé.
+    model_version : str
+        Version courante du modèle.
+    batch_size : int, optional
+        Taille des lots, par défaut ``RESCORE_BATCH_SIZE``.
+
+    Returns
+    -------
+    int
+        Nombre d'entrées rescorées.
+    """
+    import pandas as pd
+
+    rescored = 0
+    last_id = None
+
+    while True:
+        query = (
+            select(EmployeeScore)
+            .where(EmployeeScore.model_version != model_version)
+            .order_by(EmployeeScore.employee_id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            query = query.where(EmployeeScore.employee_id > last_id)
+        stale = db.scalars(query).all()
+        if not stale:
+            return rescored
+        last_id = stale[-1].employee_id
+
+        X = pd.DataFrame([s.features for s in stale], columns=model.feature_names_in_)
+        probabilities = predict_positive_proba(model, X).tolist()
+
+        scored_at = datetime.now(timezone.utc)
+        for score, probability in zip(stale, probabilities):
+            score.probability = probability
+            score.prediction = int(probability >= 0.5)
+            score.model_version = model_version
+            score.features_hash = features_hash(score.features)
+            score.scored_at = scored_at
+            score_index.put(score.employee_id, score_entry(score))
+        db.commit()
+        rescored += len(stale)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+    from app.db.session import SessionLocal
+    from app.ml.model import get_model_version, load_model
+
+    parser = argparse.ArgumentParser(
+        description="Rescore les entrées obsolètes de employee_scores."
+    )
+    parser.add_argument("--batch-size", type=int, default=RESCORE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = rescore_stale(db, load_model(), get_model_version(), args.batch_size)
+    finally:
+        db.close()
+    print(f"{count} scores recalculés")
@@ -1,11 +1,49 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.db.create_db import engine
 
-DATABASE_URL = "postgresql://adamakeb@localhost:5432/ml_api_db"
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://adamakeb@localhost:5432/ml_api_db")
+
+# Pool de connexions : connexions permanentes et débordement autorisé
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Moteur créé au premier usage : importer l'application ne se connecte pas
+# à la base et ne charge pas le driver.
+_engine = None
+_session_factory = sessionmaker()
+
+
+def get_engine():
+    """
+    Retourne le moteur SQLAlchemy (créé au premier appel).
+
+    Returns
+    -------
+    Engine
+        Moteur unique du processus, configuré par ``DATABASE_URL``,
+        ``DB_POOL_SIZE`` et ``DB_MAX_OVERFLOW``.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+        )
+    return _engine
+
+
+def SessionLocal():
+    """
+    Ouvre une session liée au moteur de l'application.
+
+    Returns
+    -------
+    Session
+        Nouvelle session SQLAlchemy.
+    """
+    return _session_factory(bind=get_engine())
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
 
 def get_db():
     """
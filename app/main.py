@@ -1,12 +1,34 @@
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Depends, Body, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-import pandas as pd
+import numpy as np
 import os
+import time
 
-from app.schemas.predict import PredictRequest
-from app.ml.model import load_model
+from app.schemas.predict import (
+    PredictRequest,
+    PredictBatchRequest,
+    PredictColumnarRequest,
+    ScoreResponse,
+    StatsResponse,
+    WhatIfRequest,
+    WhatIfResponse,
+)
+from app.schemas.wire import ARROW_STREAM_MEDIA_TYPE, decode_arrow, decode_columnar, encode_arrow
+from app.ml.model import get_model, get_model_version
+from app.ml.features import EXPECTED_FEATURES, BASE_FEATURES, derive_features
+from app.ml.inference import predict_positive_proba, warm_up
+from app.ml.early_exit import get_decision_scorer
+from app.ml.whatif import build_variants, validate_variants, variant_values
 from app.db.session import get_db
-from app.db.models import ModelInput, ModelOutput
+from app.db.models import EmployeeScore
+from app.db.persistence import PERSISTENCE_BACKEND, close_backend, get_backend, prediction_record
+from app.monitoring import LoadTracker, database_status, readiness
+from app.db.scores import is_fresh, record_scores, score_entry, score_index
+from app.db.rollups import ROLLUP_DIMENSIONS, read_rollups
 
 
 # ============================================================
@@ -17,67 +39,249 @@ IS_TESTING = os.getenv("ENV") == "test"
 
 
 # ============================================================
-# CONSTANTES
+# APP
 # ============================================================
 
-EXPECTED_FEATURES = [
-    "age",
-    "age_debut_carriere",
-    "annee_experience_totale",
-    "annees_dans_l_entreprise",
-    "annees_dans_le_poste_actuel",
-    "annees_depuis_la_derniere_promotion",
-    "annee_derniere_promotion",
-    "annes_sous_responsable_actuel",
-    "genre",
-    "statut_marital",
-    "niveau_education",
-    "domaine_etude",
-    "departement",
-    "poste",
-    "niveau_hierarchique_poste",
-    "frequence_deplacement",
-    "revenu_mensuel",
-    "augementation_salaire_precedente",
-    "salaire_par_annee_exp",
-    "heure_supplementaires",
-    "distance_domicile_travail",
-    "distance_x_deplacement",
-    "impact_trajet_sur_satisfaction",
-    "note_evaluation_actuelle",
-    "note_evaluation_precedente",
-    "evolution_note",
-    "satisfaction_employee_nature_travail",
-    "satisfaction_employee_environnement",
-    "satisfaction_employee_equilibre_pro_perso",
-    "satisfaction_employee_equipe",
-    "satisfaction_moyenne",
-    "score_satisfaction_global",
-    "delta_satisfaction_equipe",
-    "stagnation_poste",
-    "stagnation_profonde",
-    "taux_volatilite",
-    "ratio_fidelite_entreprise",
-    "ratio_poste_vs_anciennete",
-    "anciennete_x_satisfaction",
-    "nombre_experiences_precedentes",
-    "nb_formations_suivies",
-    "formations_par_annee",
-    "nombre_participation_pee",
-]
+# État de préchauffage du modèle et charge d'inférence
+state = {"model_warm": False}
+load_tracker = LoadTracker()
 
 
-# ============================================================
-# APP
-# ============================================================
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Cycle de vie de l'application : charge et préchauffe le modèle au
+    démarrage (et non à l'import du module) et construit le scorer
+    "decision only" (bornes des arbres), ferme le backend de persistance
+    à l'arrêt.
+    """
+    warm_up(get_model())
+    get_decision_scorer()
+    state["model_warm"] = True
+    yield
+    state["model_warm"] = False
+    close_backend()
+
 
 app = FastAPI(
     title="ML Model Deployment API",
     description="API exposing a machine learning model",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-model = load_model()
+
+@app.middleware("http")
+async def track_inference_load(request: Request, call_next):
+    """
+    Mesure la file d'inférence (requêtes en cours) et la latence de
+    /predict, exposées par /health/ready. Les routes de lot
+    (/predict/batch*, /whatif) ne sont pas suivies : leur durée croît
+    avec le nombre de lignes et fausserait le p99 unitaire.
+    """
+    if request.url.path != "/predict":
+        return await call_next(request)
+
+    load_tracker.start()
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        load_tracker.finish((time.perf_counter() - start) * 1000)
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def extract_features(features, required=EXPECTED_FEATURES):
+    """
+    Vérifie la présence des features attendues et les extrait.
+
+    Parameters
+    ----------
+    features : dict
+        Dictionnaire de features envoyé par le client.
+    required : list[str], optional
+        Features obligatoires, par défaut ``EXPECTED_FEATURES``.
+
+    Returns
+    -------
+    dict
+        Dictionnaire restreint à ``required``.
+
+    Raises
+    ------
+    ValueError
+        Si une feature attendue est absente.
+    """
+    data = {}
+    for feature in required:
+        if feature not in features:
+            raise ValueError(f"Feature manquante : {feature}")
+        data[feature] = features[feature]
+    return data
+
+
+def build_rows(rows, raw=False):
+    """
+    Prépare un lot de features pour le modèle et la persistance.
+
+    En mode ``raw`` seules ``BASE_FEATURES`` sont exigées ; les features
+    dérivées sont calculées en un passage vectorisé sur tout le lot.
+
+    Parameters
+    ----------
+    rows : list[dict]
+        Lignes de features envoyées par le client.
+    raw : bool, optional
+        Active le mode "raw", par défaut False.
+
+    Returns
+    -------
+    tuple[list[dict], pandas.DataFrame]
+        Lignes complètes (ordre ``EXPECTED_FEATURES``) et DataFrame
+        alignée sur ``model.feature_names_in_``.
+
+    Raises
+    ------
+    ValueError
+        Si une feature obligatoire est absente (le message indique la ligne).
+    """
+    import pandas as pd
+
+    model = get_model()
+    required = BASE_FEATURES if raw else EXPECTED_FEATURES
+    data = []
+    for i, features in enumerate(rows):
+        try:
+            data.append(extract_features(features, required))
+        except ValueError as e:
+            raise ValueError(f"Ligne {i} : {e}")
+
+    if not raw:
+        return data, pd.DataFrame(data, columns=model.feature_names_in_)
+
+    frame = derive_features(pd.DataFrame(data, columns=BASE_FEATURES))
+    data = frame[EXPECTED_FEATURES].to_dict("records")
+    return data, frame[model.feature_names_in_]
+
+
+def complete_frame(frame, raw=False):
+    """
+    Vérifie les colonnes d'un lot déjà columnaire et le complète.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Lot décodé (JSON positionnel ou Arrow).
+    raw : bool, optional
+        Active le mode "raw", par défaut False.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Lot contenant toutes les ``EXPECTED_FEATURES``.
+
+    Raises
+    ------
+    ValueError
+        Si des colonnes obligatoires sont absentes.
+    """
+    required = BASE_FEATURES if raw else EXPECTED_FEATURES
+    missing = [feature for feature in required if feature not in frame.columns]
+    if missing:
+        raise ValueError(f"Feature manquante : {', '.join(missing)}")
+    if raw:
+        frame = derive_features(frame)
+    return frame
+
+
+def persist_batch(db, rows, predictions, probabilities, employee_ids=None):
+    """
+    Enregistre un lot d'entrées et de prédictions via le backend de
+    persistance configuré (``PERSISTENCE_BACKEND``).
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    rows : list[dict]
+        Features complètes de chaque ligne.
+    predictions : list[int]
+        Prédictions, dans l'ordre de ``rows``.
+    probabilities : list[float]
+        Probabilités, dans l'ordre de ``rows``.
+    employee_ids : list[str], optional
+        Identifiants (ou None) de chaque ligne, par défaut aucun.
+    """
+    if employee_ids is None:
+        employee_ids = [None] * len(rows)
+    get_backend().save(db, [
+        prediction_record(data, prediction, probability, employee_id, get_model_version())
+        for data, prediction, probability, employee_id
+        in zip(rows, predictions, probabilities, employee_ids)
+    ])
+
+
+def score_batch(X, decision_only=False):
+    """
+    Score un lot aligné sur le modèle.
+
+    En mode ``decision_only`` seule la décision est calculée, avec
+    sortie anticipée du boosting (``DecisionScorer``) : les probabilités
+    valent alors None.
+
+    Parameters
+    ----------
+    X : pandas.DataFrame
+        Features alignées sur ``model.feature_names_in_``.
+    decision_only : bool, optional
+        Active le mode "decision only", par défaut False.
+
+    Returns
+    -------
+    tuple[list[int], list[float | None], float | None]
+        Prédictions, probabilités et nombre moyen d'arbres évalués par
+        ligne (None hors mode "decision only").
+    """
+    if decision_only:
+        decisions, trees_evaluated = get_decision_scorer().decide(X)
+        mean_trees = float(trees_evaluated.mean()) if len(X) else 0.0
+        return decisions.tolist(), [None] * len(X), mean_trees
+
+    probabilities = predict_positive_proba(get_model(), X).tolist()
+    predictions = [int(p >= 0.5) for p in probabilities]
+    return predictions, probabilities, None
+
+
+def score_frame(frame, db, decision_only=False):
+    """
+    Score un lot columnaire complet et le persiste (hors tests / CI).
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Lot contenant toutes les ``EXPECTED_FEATURES``.
+    db : Session
+        Session SQLAlchemy.
+    decision_only : bool, optional
+        Active le mode "decision only", par défaut False.
+
+    Returns
+    -------
+    tuple[list[int], list[float | None], float | None]
+        Prédictions, probabilités et nombre moyen d'arbres évalués.
+    """
+    model = get_model()
+    X = frame[model.feature_names_in_]
+    predictions, probabilities, mean_trees = score_batch(X, decision_only)
+
+    if not IS_TESTING and len(frame):
+        rows = frame[EXPECTED_FEATURES].to_dict("records")
+        persist_batch(db, rows, predictions, probabilities)
+
+    return predictions, probabilities, mean_trees
 
 
 # ============================================================
@@ -97,6 +301,178 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/health/live")
+def health_live():
+    """
+    Liveness : le processus répond.
+
+    Returns
+    -------
+    dict
+        Objet JSON simple indiquant le statut de l'API.
+    """
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def health_ready(db: Session = Depends(get_db)):
+    """
+    Readiness : l'instance peut servir du trafic rapidement.
+
+    L'instance est prête si le modèle est préchauffé, si la base répond
+    avec de la marge dans le pool de connexions, et si la file
+    d'inférence et le p99 récent restent sous les seuils configurés.
+    Avec le backend ``segment_log``, /predict ne dépend pas de la base :
+    son état est alors rapporté à titre informatif.
+
+    Parameters
+    ----------
+    db : Session, optional
+        Session SQLAlchemy (injected par dépendance), par défaut Depends(get_db).
+
+    Returns
+    -------
+    JSONResponse
+        200 si prête, 503 sinon ; le corps détaille les checks et les
+        chiffres de charge (file, latences, pool DB, saturation).
+    """
+    db_status = database_status(db)
+    load = load_tracker.snapshot()
+    db_required = PERSISTENCE_BACKEND != "segment_log"
+    result = readiness(state["model_warm"], db_status, load, db_required)
+
+    return JSONResponse(
+        status_code=200 if result["ready"] else 503,
+        content={
+            "status": "ready" if result["ready"] else "not_ready",
+            "reasons": result["reasons"],
+            "model": {"warm": state["model_warm"], "version": get_model_version()},
+            "database": {**db_status, "required": db_required},
+            "inference": load,
+            "saturation": result["saturation"],
+            "thresholds": result["thresholds"],
+        },
+    )
+
+
+@app.get("/scores/{employee_id}", response_model=ScoreResponse)
+def get_score(
+    employee_id: str,
+    db: Session = Depends(get_db),
+):
+    """
+    Renvoie le dernier score connu d'un employé.
+
+    Le score est lu dans l'index mémoire, puis dans la table
+    ``employee_scores``. S'il a été produit par une autre version du
+    modèle, il est recalculé à la volée à partir des dernières features
+    connues de l'employé.
+
+    Parameters
+    ----------
+    employee_id : str
+        Identifiant envoyé lors d'un appel à /predict.
+    db : Session, optional
+        Session SQLAlchemy (injected par dépendance), par défaut Depends(get_db).
+
+    Returns
+    -------
+    dict
+        Score de l'employé et sa provenance ('index', 'table' ou 'live').
+
+    Raises
+    ------
+    HTTPException
+        404 si aucun score n'est connu pour cet employé.
+    """
+    entry = score_index.get(employee_id)
+    if entry is not None and is_fresh(entry, get_model_version()):
+        return {**entry, "source": "index"}
+
+    score = db.get(EmployeeScore, employee_id)
+    if score is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Aucun score pour l'employé {employee_id}",
+        )
+
+    entry = score_entry(score)
+    if is_fresh(entry, get_model_version()):
+        score_index.put(employee_id, entry)
+        return {**entry, "source": "table"}
+
+    # Score obsolète : recalcul à partir des dernières features connues
+    import pandas as pd
+
+    model = get_model()
+    X = pd.DataFrame([score.features], columns=model.feature_names_in_)
+    probability = float(model.predict_proba(X)[0][1])
+    prediction = int(probability >= 0.5)
+    record_scores(
+        db,
+        [employee_id],
+        [score.features],
+        [prediction],
+        [probability],
+        get_model_version(),
+        persist=not IS_TESTING,
+    )
+    return {**score_index.get(employee_id), "source": "live"}
+
+
+@app.get("/stats", response_model=StatsResponse)
+def get_stats(
+    dimension: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    daily: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Statistiques de prédiction par valeur d'une dimension.
+
+    Les chiffres sont lus dans les agrégats ``prediction_rollups``,
+    maintenus à chaque persistance : le temps de réponse ne dépend pas
+    du volume d'historique.
+
+    Parameters
+    ----------
+    dimension : str
+        Feature agrégée (une des ``ROLLUP_DIMENSIONS``).
+    start, end : date, optional
+        Premier et dernier jour (inclus), par défaut toute la période.
+    daily : bool, optional
+        Un groupe par jour plutôt que sur toute la période, par défaut False.
+    db : Session, optional
+        Session SQLAlchemy (injected par dépendance), par défaut Depends(get_db).
+
+    Returns
+    -------
+    dict
+        Groupes par valeur (et jour) : nombre de prédictions, positives,
+        taux de churn, probabilité moyenne et histogramme des probabilités.
+
+    Raises
+    ------
+    HTTPException
+        400 si la dimension n'est pas agrégée ou si ``start`` > ``end``.
+    """
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dimension non agrégée : {dimension} (disponibles : {', '.join(ROLLUP_DIMENSIONS)})",
+        )
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start doit précéder end")
+
+    return {
+        "dimension": dimension,
+        "start": start,
+        "end": end,
+        "groups": read_rollups(db, dimension, start, end, daily),
+    }
+
+
 @app.post("/predict")
 def predict(
     request: PredictRequest,
@@ -105,6 +481,10 @@ def predict(
     """
     Endpoint de prédiction qui renvoie la prédiction et la probabilité.
 
+    Avec ``decision_only`` seule la prédiction est calculée : la
+    probabilité vaut None et 'trees_evaluated' indique le nombre
+    d'arbres évalués avant que la décision soit acquise.
+
     Parameters
     ----------
     request : PredictRequest
@@ -115,59 +495,84 @@ def predict(
     Returns
     -------
     dict
-        Dictionnaire contenant 'prediction' (0 ou 1) et 'probability' (float).
+        Dictionnaire contenant 'prediction' (0 ou 1) et 'probability'
+        (float, None en mode "decision only").
 
     Raises
     ------
     HTTPException
-        400 en cas de features manquantes ou invalides, 500 en cas d'erreur interne.
+        400 en cas de features manquantes ou invalides ou de ``decision_only``
+        avec un ``employee_id``, 500 en cas d'erreur interne.
     """
+    import pandas as pd
+
+    model = get_model()
     try:
         # ----------------------------------------------------
         # 1. Vérification des features attendues
         # ----------------------------------------------------
-        data = {}
-        for feature in EXPECTED_FEATURES:
-            if feature not in request.features:
-                raise ValueError(f"Feature manquante : {feature}")
-            data[feature] = request.features[feature]
+        # Sans probabilité, le score écraserait le dernier score complet
+        if request.decision_only and request.employee_id is not None:
+            raise ValueError("decision_only est incompatible avec employee_id")
+        if request.raw:
+            data = extract_features(request.features, BASE_FEATURES)
+        else:
+            data = extract_features(request.features)
 
         # ----------------------------------------------------
         # 2. Création DataFrame alignée avec le modèle
+        #    (mode raw : calcul des features dérivées)
         # ----------------------------------------------------
+        if request.raw:
+            frame = derive_features(pd.DataFrame([data], columns=BASE_FEATURES))
+            data = frame[EXPECTED_FEATURES].to_dict("records")[0]
         X = pd.DataFrame([data], columns=model.feature_names_in_)
 
         # ----------------------------------------------------
         # 3. Prédiction
         # ----------------------------------------------------
-        proba = model.predict_proba(X)[0]
-        probability = float(proba[1])
-        prediction = int(probability >= 0.5)
+        trees_evaluated = None
+        if request.decision_only:
+            decisions, trees = get_decision_scorer().decide(X)
+            prediction = int(decisions[0])
+            probability = None
+            trees_evaluated = int(trees[0])
+        else:
+            proba = model.predict_proba(X)[0]
+            probability = float(proba[1])
+            prediction = int(probability >= 0.5)
 
         # ----------------------------------------------------
         # 4. Persistance DB (désactivée en tests / CI)
         # ----------------------------------------------------
         if not IS_TESTING:
-            model_input = ModelInput(features=data)
-            db.add(model_input)
-            db.commit()
-            db.refresh(model_input)
-
-            model_output = ModelOutput(
-                input_id=model_input.id,
-                prediction=prediction,
-                probability=probability,
+            persist_batch(db, [data], [prediction], [probability], [request.employee_id])
+
+        # ----------------------------------------------------
+        # 5. Score de l'employé (index mémoire ; la table est
+        #    alimentée par le backend de persistance)
+        # ----------------------------------------------------
+        if request.employee_id is not None:
+            record_scores(
+                db,
+                [request.employee_id],
+                [data],
+                [prediction],
+                [probability],
+                get_model_version(),
+                persist=False,
             )
-            db.add(model_output)
-            db.commit()
 
         # ----------------------------------------------------
-        # 5. Réponse API
+        # 6. Réponse API
         # ----------------------------------------------------
-        return {
+        response = {
             "prediction": prediction,
             "probability": probability,
         }
+        if request.decision_only:
+            response["trees_evaluated"] = trees_evaluated
+        return response
 
     except ValueError as e:
         db.rollback()
@@ -183,3 +588,309 @@ def predict(
             status_code=500,
             detail="Internal server error",
         )
+
+
+@app.post("/predict/batch")
+def predict_batch(
+    request: PredictBatchRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Endpoint de prédiction par lot.
+
+    Les gros lots (au-delà de ``INFERENCE_POOL_MIN_BATCH`` lignes) sont
+    automatiquement répartis sur un pool de processus. Avec
+    ``decision_only`` seules les prédictions sont calculées, avec sortie
+    anticipée du boosting.
+
+    Parameters
+    ----------
+    request : PredictBatchRequest
+        Objet Pydantic contenant la liste des lignes de features.
+    db : Session, optional
+        Session SQLAlchemy (injected par dépendance), par défaut Depends(get_db).
+
+    Returns
+    -------
+    dict
+        Dictionnaire contenant 'results' : une entrée 'prediction' /
+        'probability' par ligne, dans l'ordre de la requête (et
+        'mean_trees_evaluated' en mode "decision only").
+
+    Raises
+    ------
+    HTTPException
+        400 en cas de features manquantes ou invalides ou de ``decision_only``
+        avec des ``employee_ids``, 500 en cas d'erreur interne.
+    """
+    try:
+        # ----------------------------------------------------
+        # 1. Vérification des features attendues
+        # 2. Création DataFrame alignée avec le modèle
+        #    (mode raw : calcul vectorisé des features dérivées)
+        # ----------------------------------------------------
+        if request.employee_ids is not None and len(request.employee_ids) != len(request.rows):
+            raise ValueError("employee_ids doit contenir un identifiant par ligne")
+        if request.decision_only and any(i is not None for i in request.employee_ids or []):
+            raise ValueError("decision_only est incompatible avec employee_ids")
+        rows, X = build_rows(request.rows, request.raw)
+
+        # ----------------------------------------------------
+        # 3. Prédiction (in-process ou pool selon la taille,
+        #    sortie anticipée en mode "decision only")
+        # ----------------------------------------------------
+        predictions, probabilities, mean_trees = score_batch(X, request.decision_only)
+
+        # ----------------------------------------------------
+        # 4. Persistance DB (désactivée en tests / CI)
+        # ----------------------------------------------------
+        if not IS_TESTING and rows:
+            persist_batch(db, rows, predictions, probabilities, request.employee_ids)
+
+        # ----------------------------------------------------
+        # 5. Scores des employés (index mémoire ; la table est
+        #    alimentée par le backend de persistance)
+        # ----------------------------------------------------
+        if request.employee_ids is not None:
+            record_scores(
+                db,
+                request.employee_ids,
+                rows,
+                predictions,
+                probabilities,
+                get_model_version(),
+                persist=False,
+            )
+
+        # ----------------------------------------------------
+        # 6. Réponse API
+        # ----------------------------------------------------
+        response = {
+            "results": [
+                {"prediction": prediction, "probability": probability}
+                for prediction, probability in zip(predictions, probabilities)
+            ]
+        }
+        if request.decision_only:
+            response["mean_trees_evaluated"] = mean_trees
+        return response
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+
+    except Exception as e:
+        db.rollback()
+        print("❌ Internal error:", repr(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error",
+        )
+
+
+@app.post("/predict/batch/columnar")
+def predict_batch_columnar(
+    request: PredictColumnarRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    Endpoint de prédiction par lot au format positionnel.
+
+    Les noms de colonnes sont envoyés une seule fois (``columns``), suivis
+    des valeurs de chaque ligne (``rows``). Le lot est décodé directement
+    en DataFrame, sans dictionnaire par ligne.
+
+    Parameters
+    ----------
+    request : PredictColumnarRequest
+        En-tête de colonnes, lignes positionnelles et mode raw.
+    db : Session, optional
+        Session SQLAlchemy (injected par dépendance), par défaut Depends(get_db).
+
+    Returns
+    -------
+    dict
+        Réponse columnaire : 'prediction' et 'probability' sont deux
+        listes alignées sur les lignes de la requête (et
+        'mean_trees_evaluated' en mode "decision only").
+
+    Raises
+    ------
+    HTTPException
+        400 en cas de features manquantes ou invalides, 500 en cas d'erreur interne.
+    """
+    try:
+        frame = complete_frame(decode_columnar(request.columns, request.rows), request.raw)
+        predictions, probabilities, mean_trees = score_frame(frame, db, request.decision_only)
+        response = {
+            "prediction": predictions,
+            "probability": probabilities,
+        }
+        if request.decision_only:
+            response["mean_trees_evaluated"] = mean_trees
+        return response
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+
+    except Exception as e:
+        db.rollback()
+        print("❌ Internal error:", repr(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error",
+        )
+
+
+@app.post("/predict/batch/arrow")
+def predict_batch_arrow(
+    body: bytes = Body(..., media_type=ARROW_STREAM_MEDIA_TYPE),
+    raw: bool = False,
+    decision_only: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Endpoint de prédiction par lot au format Arrow IPC.
+
+    Le corps est un flux Arrow IPC (une colonne par feature) ; la réponse
+    est un flux Arrow IPC à deux colonnes 'prediction' et 'probability'.
+    En mode "decision only" la colonne 'probability' est nulle et le
+    nombre moyen d'arbres évalués est renvoyé dans l'en-tête
+    ``X-Mean-Trees-Evaluated``.
+
+    Parameters
+    ----------
+    body : bytes
+        Flux Arrow IPC ("stream").
+    raw : bool, optional
+        Active le mode "raw" (paramètre de requête), par défaut False.
+    decision_only : bool, optional
+        Active le mode "decision only" (paramètre de requête), par défaut False.
+    db : Session, optional
+        Session SQLAlchemy (injected par dépendance), par défaut Depends(get_db).
+
+    Returns
+    -------
+    Response
+        Flux Arrow IPC des résultats, dans l'ordre des lignes.
+
+    Raises
+    ------
+    HTTPException
+        400 en cas de flux ou de features invalides, 500 en cas d'erreur interne.
+    """
+    import pandas as pd
+
+    try:
+        frame = complete_frame(decode_arrow(body), raw)
+        predictions, probabilities, mean_trees = score_frame(frame, db, decision_only)
+        content = encode_arrow({
+            "prediction": np.asarray(predictions, dtype=np.int8),
+            # None (mode "decision only") -> valeurs nulles Arrow
+            "probability": pd.Series(probabilities, dtype="float64"),
+        })
+        headers = {}
+        if decision_only:
+            headers["X-Mean-Trees-Evaluated"] = f"{mean_trees:.2f}"
+        return Response(content=content, media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+
+    except Exception as e:
+        db.rollback()
+        print("❌ Internal error:", repr(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error",
+        )
+
+
+@app.post("/whatif", response_model=WhatIfResponse)
+def whatif(request: WhatIfRequest):
+    """
+    Sensibilité du risque d'un employé à des modifications de features.
+
+    Les variantes (grille ou liste explicite) sont construites en
+    diffusant la ligne de base ; les features dérivées dépendant des
+    colonnes modifiées sont recalculées, puis la ligne de base et toutes
+    les variantes sont scorées en un seul appel vectorisé. Rien n'est
+    persisté.
+
+    Parameters
+    ----------
+    request : WhatIfRequest
+        Features de base, mode raw et ``grid`` ou ``overrides``.
+
+    Returns
+    -------
+    dict
+        Score de base et tableau compact des variantes : 'columns',
+        'values' (une ligne par variante), 'prediction' et 'probability'.
+
+    Raises
+    ------
+    HTTPException
+        400 si une feature est manquante, inconnue ou invalide, ou si le
+        nombre de variantes dépasse ``WHATIF_MAX_VARIANTS`` ; 500 en cas
+        d'erreur interne.
+    """
+    import pandas as pd
+
+    model = get_model()
+    try:
+        # ----------------------------------------------------
+        # 1. Features de base (mode raw : calcul des dérivées)
+        # ----------------------------------------------------
+        if request.raw:
+            data = extract_features(request.features, BASE_FEATURES)
+            frame = derive_features(pd.DataFrame([data], columns=BASE_FEATURES))
+            data = frame[EXPECTED_FEATURES].to_dict("records")[0]
+        else:
+            data = extract_features(request.features)
+
+        # ----------------------------------------------------
+        # 2. Variantes (ligne de base diffusée) et validation
+        # ----------------------------------------------------
+        columns, values = variant_values(data, request.grid, request.overrides)
+        X = build_variants(data, columns, values, model.feature_names_in_)
+        validate_variants(data, columns, X)
+
+        # ----------------------------------------------------
+        # 3. Prédiction (un seul appel pour tout le lot)
+        # ----------------------------------------------------
+        probabilities = predict_positive_proba(model, X).tolist()
+        predictions = [int(p >= 0.5) for p in probabilities]
+
+        return {
+            "base_prediction": predictions[0],
+            "base_probability": probabilities[0],
+            "columns": columns,
+            "values": values,
+            "prediction": predictions[1:],
+            "probability": probabilities[1:],
+        }
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+
+    except Exception as e:
+        print("❌ Internal error:", repr(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error",
+        )
@@ -0,0 +1,173 @@
+import os
+import threading
+
+import numpy as np
+
+from app.ml.model import get_model
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Nombre d'arbres évalués entre deux tests de sortie anticipée
+EARLY_EXIT_BLOCK = int(os.getenv("EARLY_EXIT_BLOCK", "25"))
+
+# Marge autour de la frontière (score brut 0) : absorbe les écarts
+# d'arrondi entre sommes partielles et score complet.
+DECISION_MARGIN = 1e-9
+
+
+# ============================================================
+# BORNES PAR ARBRE
+# ============================================================
+
+def _leaf_values(node):
+    """
+    Valeurs des feuilles d'un arbre de ``Booster.dump_model()``.
+    """
+    if "leaf_value" in node:
+        return [node["leaf_value"]]
+    return _leaf_values(node["left_child"]) + _leaf_values(node["right_child"])
+
+
+def remaining_bounds(booster, n_trees):
+    """
+    Bornes de la contribution des arbres restants au score brut.
+
+    Parameters
+    ----------
+    booster : lightgbm.Booster
+        Booster binaire.
+    n_trees : int
+        Nombre d'arbres utilisés pour la prédiction.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        ``(minimum, maximum)`` de taille ``n_trees + 1`` : l'indice ``t``
+        borne la somme des sorties des arbres ``t`` à ``n_trees - 1``.
+    """
+    trees = booster.dump_model()["tree_info"][:n_trees]
+    leaf_min = np.empty(n_trees, dtype=np.float64)
+    leaf_max = np.empty(n_trees, dtype=np.float64)
+    for t, tree in enumerate(trees):
+        values = _leaf_values(tree["tree_structure"])
+        leaf_min[t] = min(values)
+        leaf_max[t] = max(values)
+    minimum = np.append(np.cumsum(leaf_min[::-1])[::-1], 0.0)
+    maximum = np.append(np.cumsum(leaf_max[::-1])[::-1], 0.0)
+    return minimum, maximum
+
+
+# ============================================================
+# SCORING "DECISION ONLY"
+# ============================================================
+
+class DecisionScorer:
+    """
+    Décision binaire (``probability >= 0.5``) avec sortie anticipée.
+
+    Les arbres du booster sont évalués par blocs (``start_iteration`` /
+    ``num_iteration``). Après chaque bloc, le score brut partiel de chaque
+    ligne est comparé aux bornes précalculées de la contribution des
+    arbres restants : si aucune combinaison de feuilles ne peut faire
+    changer son signe, la ligne sort. Une ligne jamais décidée a évalué
+    tous les arbres, sa décision est celle du modèle complet.
+
+    Parameters
+    ----------
+    model : sklearn.pipeline.Pipeline
+        Pipeline (prétraitement + LGBMClassifier binaire).
+    block_size : int, optional
+        Arbres par bloc, par défaut ``EARLY_EXIT_BLOCK``.
+
+    Raises
+    ------
+    ValueError
+        Si le modèle n'est pas un pipeline LightGBM binaire.
+    """
+
+    def __init__(self, model, block_size=EARLY_EXIT_BLOCK):
+        estimator = model.steps[-1][1] if hasattr(model, "steps") else None
+        booster = getattr(estimator, "booster_", None)
+        if booster is None or booster.num_model_per_iteration() != 1:
+            raise ValueError("Pipeline LightGBM binaire attendu")
+
+        self.model = model
+        self.preprocess = model[:-1]
+        self.booster = booster
+        self.block_size = max(1, block_size)
+        self.n_trees = booster.best_iteration or booster.current_iteration()
+        self.remaining_min, self.remaining_max = remaining_bounds(booster, self.n_trees)
+
+    def decide(self, X):
+        """
+        Calcule la décision de chaque ligne.
+
+        Parameters
+        ----------
+        X : pandas.DataFrame
+            Features alignées sur ``model.feature_names_in_``.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            Décisions (0 / 1) et nombre d'arbres évalués par ligne.
+        """
+        n_rows = len(X)
+        decisions = np.zeros(n_rows, dtype=np.int64)
+        trees_evaluated = np.full(n_rows, self.n_trees, dtype=np.int64)
+        if n_rows == 0:
+            return decisions, trees_evaluated
+
+        Xt = self.preprocess.transform(X)
+        active = np.arange(n_rows)
+        partial = np.zeros(n_rows, dtype=np.float64)
+
+        for start in range(0, self.n_trees, self.block_size):
+            stop = min(start + self.block_size, self.n_trees)
+            partial[active] += self.booster.predict(
+                Xt[active],
+                raw_score=True,
+                start_iteration=start,
+                num_iteration=stop - start,
+            )
+
+            positive = partial[active] + self.remaining_min[stop] >= DECISION_MARGIN
+            negative = partial[active] + self.remaining_max[stop] <= -DECISION_MARGIN
+            done = positive | negative
+
+            decisions[active[positive]] = 1
+            trees_evaluated[active[done]] = stop
+            active = active[~done]
+            if active.size == 0:
+                break
+
+        # Lignes restées à la frontière : décision du modèle complet
+        if active.size:
+            probabilities = self.model.predict_proba(X.iloc[active])[:, 1]
+            decisions[active] = (probabilities >= 0.5).astype(np.int64)
+
+        return decisions, trees_evaluated
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_decision_scorer():
+    """
+    Retourne le ``DecisionScorer`` du modèle courant (créé au premier appel).
+
+    Returns
+    -------
+    DecisionScorer
+        Scorer partagé.
+    """
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = DecisionScorer(get_model())
+    return _scorer
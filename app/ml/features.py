@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+
+
+
+# ============================================================
+# CONSTANTES
+# ============================================================
+
+EXPECTED_FEATURES = [
+    "age",
+    "age_debut_carriere",
+    "annee_experience_totale",
+    "annees_dans_l_entreprise",
+    "annees_dans_le_poste_actuel",
+    "annees_depuis_la_derniere_promotion",
+    "annee_derniere_promotion",
+    "annes_sous_responsable_actuel",
+    "genre",
+    "statut_marital",
+    "niveau_education",
+    "domaine_etude",
+    "departement",
+    "poste",
+    "niveau_hierarchique_poste",
+    "frequence_deplacement",
+    "revenu_mensuel",
+    "augementation_salaire_precedente",
+    "salaire_par_annee_exp",
+    "heure_supplementaires",
+    "distance_domicile_travail",
+    "distance_x_deplacement",
+    "impact_trajet_sur_satisfaction",
+    "note_evaluation_actuelle",
+    "note_evaluation_precedente",
+    "evolution_note",
+    "satisfaction_employee_nature_travail",
+    "satisfaction_employee_environnement",
+    "satisfaction_employee_equilibre_pro_perso",
+    "satisfaction_employee_equipe",
+    "satisfaction_moyenne",
+    "score_satisfaction_global",
+    "delta_satisfaction_equipe",
+    "stagnation_poste",
+    "stagnation_profonde",
+    "taux_volatilite",
+    "ratio_fidelite_entreprise",
+    "ratio_poste_vs_anciennete",
+    "anciennete_x_satisfaction",
+    "nombre_experiences_precedentes",
+    "nb_formations_suivies",
+    "formations_par_annee",
+    "nombre_participation_pee",
+]
+
+# Features textuelles (encodées par OneHotEncoder dans le pipeline)
+CATEGORICAL_FEATURES = [
+    "statut_marital",
+    "domaine_etude",
+    "departement",
+    "poste",
+]
+
+
+# Features dérivées : calculées par l'API à partir des features de base
+# en mode "raw" (voir ``derive_features``). Seules les features dont la
+# définition est établie (règle ORM ou cohérente avec toutes les charges
+# utiles de référence des tests) sont dérivées ; les autres features
+# construites à l'entraînement (ratios, stagnation, produits…) ne sont
+# pas reconstituables ici et restent à fournir par le client.
+DERIVED_FEATURES = [
+    "annee_derniere_promotion",
+    "evolution_note",
+    "satisfaction_moyenne",
+]
+
+# Features à fournir par le client en mode "raw"
+BASE_FEATURES = [f for f in EXPECTED_FEATURES if f not in DERIVED_FEATURES]
+
+SATISFACTION_FEATURES = [
+    "satisfaction_employee_nature_travail",
+    "satisfaction_employee_environnement",
+    "satisfaction_employee_equilibre_pro_perso",
+    "satisfaction_employee_equipe",
+]
+
+# Features de base utilisées par chaque feature dérivée
+DERIVED_DEPENDENCIES = {
+    "annee_derniere_promotion": ["annees_depuis_la_derniere_promotion"],
+    "evolution_note": ["note_evaluation_actuelle", "note_evaluation_precedente"],
+    "satisfaction_moyenne": SATISFACTION_FEATURES,
+}
+
+
+# ============================================================
+# DÉRIVATION
+# ============================================================
+
+def dependent_features(columns):
+    """
+    Features dérivées à recalculer quand ``columns`` changent.
+
+    Parameters
+    ----------
+    columns : iterable[str]
+        Features de base modifiées.
+
+    Returns
+    -------
+    list[str]
+        Features dérivées dépendantes, dans l'ordre de ``DERIVED_FEATURES``.
+    """
+    columns = set(columns)
+    return [
+        feature for feature in DERIVED_FEATURES
+        if columns.intersection(DERIVED_DEPENDENCIES[feature])
+    ]
+
+
+def derive_features(frame):
+    """
+    Calcule les features dérivées à partir des features de base.
+
+    Le calcul est vectorisé : un seul passage par colonne pour tout le
+    lot. Les valeurs produites respectent les règles de cohérence de
+    ``ModelInput.validate_features``.
+
+    Parameters
+    ----------
+    frame : pandas.DataFrame
+        Lot contenant au moins ``BASE_FEATURES``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Copie de ``frame`` complétée des colonnes ``DERIVED_FEATURES``
+        (les valeurs éventuellement fournies sont écrasées).
+    """
+    frame = frame.copy()
+    current_year = datetime.now(timezone.utc).year
+
+    frame["annee_derniere_promotion"] = (
+        current_year - frame["annees_depuis_la_derniere_promotion"]
+    )
+    frame["evolution_note"] = (
+        frame["note_evaluation_actuelle"] - frame["note_evaluation_precedente"]
+    )
+    frame["satisfaction_moyenne"] = frame[SATISFACTION_FEATURES].mean(axis=1)
+    return frame
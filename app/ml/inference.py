@@ -0,0 +1,373 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from app.ml.features import CATEGORICAL_FEATURES
+from app.ml.model import load_model
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+def available_cpus():
+    """
+    Nombre de CPU réellement utilisables par le processus.
+
+    Tient compte de l'affinité (cpuset) et, sous cgroup v2, du quota CPU
+    du conteneur (``cpu.max``), que ``os.cpu_count()`` ignore.
+
+    Returns
+    -------
+    int
+        Nombre de CPU (au moins 1).
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, int(quota) // int(period))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+# Taille de lot à partir de laquelle le pool de processus est utilisé
+# (0 désactive complètement le pool).
+POOL_MIN_BATCH = int(os.getenv("INFERENCE_POOL_MIN_BATCH", "5000"))
+
+# Nombre de processus workers du pool.
+POOL_WORKERS = int(os.getenv("INFERENCE_POOL_WORKERS", str(available_cpus())))
+
+# Nombre minimal de lignes envoyées à un worker en une tâche.
+POOL_MIN_CHUNK = int(os.getenv("INFERENCE_POOL_MIN_CHUNK", "500"))
+
+
+# ============================================================
+# ENCODAGE MATRICE PARTAGÉE
+# ============================================================
+
+def encode_frame(X):
+    """
+    Encode un DataFrame en matrice float64 contiguë.
+
+    Les colonnes numériques sont copiées telles quelles, les colonnes
+    texte sont remplacées par leurs codes (``pd.factorize``) et les
+    modalités correspondantes sont retournées à part.
+
+    Parameters
+    ----------
+    X : pandas.DataFrame
+        Features alignées sur ``model.feature_names_in_``.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, dict]
+        Matrice (n_lignes, n_colonnes) et dictionnaire
+        {indice_colonne: tableau des modalités}.
+    """
+    import pandas as pd
+
+    matrix = np.empty((len(X), X.shape[1]), dtype=np.float64)
+    categories = {}
+    for j, column in enumerate(X.columns):
+        values = X[column]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            matrix[:, j] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            codes, uniques = pd.factorize(values)
+            matrix[:, j] = codes
+            categories[j] = np.asarray(uniques, dtype=object)
+    return matrix, categories
+
+
+def decode_frame(matrix, columns, categories):
+    """
+    Reconstruit le DataFrame d'origine à partir de la matrice encodée.
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray
+        Matrice produite par ``encode_frame`` (ou une tranche de lignes).
+    columns : list[str]
+        Noms des colonnes, dans l'ordre de la matrice.
+    categories : dict
+        Modalités des colonnes texte, indexées par position.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame équivalent à l'entrée de ``encode_frame``.
+    """
+    import pandas as pd
+
+    data = {}
+    for j, column in enumerate(columns):
+        if j in categories:
+            codes = matrix[:, j].astype(np.int64)
+            labels = np.append(categories[j], None)
+            data[column] = labels[codes]
+        else:
+            data[column] = matrix[:, j]
+    return pd.DataFrame(data, columns=columns)
+
+
+# ============================================================
+# PRÉCHAUFFAGE
+# ============================================================
+
+def warm_up(model):
+    """
+    Exécute une prédiction factice pour préchauffer le modèle.
+
+    Le premier appel à ``predict_proba`` initialise les structures
+    internes (ColumnTransformer, booster LightGBM) ; le faire au
+    démarrage évite de le payer sur la première requête.
+
+    Parameters
+    ----------
+    model : object
+        Modèle chargé.
+    """
+    import pandas as pd
+
+    row = {
+        column: "" if column in CATEGORICAL_FEATURES else 0
+        for column in model.feature_names_in_
+    }
+    model.predict_proba(pd.DataFrame([row], columns=model.feature_names_in_))
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+_worker_model = None
+
+
+def _init_worker():
+    """
+    Charge le modèle une seule fois par processus worker.
+
+    LightGBM est limité à un thread par worker : le parallélisme vient
+    du pool, pas d'OpenMP.
+    """
+    global _worker_model
+    _worker_model = load_model()
+    estimator = _worker_model.steps[-1][1] if hasattr(_worker_model, "steps") else _worker_model
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=1)
+
+
+def _score_chunk(input_name, output_name, shape, columns, categories, start, stop):
+    """
+    Score les lignes [start, stop) de la matrice partagée.
+
+    Les probabilités de la classe positive sont écrites directement dans
+    le buffer de sortie partagé, à la même position que les lignes
+    d'entrée : l'ordre est donc préservé sans réassemblage.
+    """
+    shm_in = shared_memory.SharedMemory(name=input_name)
+    shm_out = shared_memory.SharedMemory(name=output_name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm_in.buf)
+        output = np.ndarray((shape[0],), dtype=np.float64, buffer=shm_out.buf)
+
+        X = decode_frame(matrix[start:stop], columns, categories)
+        output[start:stop] = _worker_model.predict_proba(X)[:, 1]
+
+        # Les vues numpy doivent être libérées avant close()
+        del matrix, output
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return stop - start
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class ProcessPoolBackend:
+    """
+    Backend d'inférence répartissant un lot sur un pool de processus.
+
+    Chaque worker charge le modèle une fois à son démarrage. Les
+    features transitent par mémoire partagée (pas de pickling de la
+    matrice), seules les bornes de chaque tranche sont envoyées.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Nombre de processus, par défaut ``POOL_WORKERS``.
+    min_chunk : int, optional
+        Taille minimale d'une tranche, par défaut ``POOL_MIN_CHUNK``.
+    """
+
+    def __init__(self, workers=POOL_WORKERS, min_chunk=POOL_MIN_CHUNK):
+        self.workers = max(1, workers)
+        self.min_chunk = max(1, min_chunk)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # "spawn" évite de forker un processus dont les threads
+                # OpenMP (LightGBM) sont déjà initialisés.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _reset_executor(self, executor):
+        # Un worker mort (OOM, segfault) casse tout l'executor : il est
+        # abandonné pour que le prochain lot en recrée un.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _chunks(self, n_rows):
+        size = max(self.min_chunk, -(-n_rows // self.workers))
+        return [(start, min(start + size, n_rows)) for start in range(0, n_rows, size)]
+
+    def predict_proba(self, X):
+        """
+        Calcule la probabilité de la classe positive pour chaque ligne.
+
+        Parameters
+        ----------
+        X : pandas.DataFrame
+            Features alignées sur ``model.feature_names_in_``.
+
+        Returns
+        -------
+        numpy.ndarray
+            Probabilités, dans l'ordre des lignes de ``X``.
+
+        Raises
+        ------
+        BrokenProcessPool
+            Si un worker est mort pendant le lot ; l'executor est alors
+            réinitialisé pour les lots suivants.
+        """
+        n_rows = len(X)
+        if n_rows == 0:
+            return np.empty(0, dtype=np.float64)
+
+        matrix, categories = encode_frame(X)
+        columns = list(X.columns)
+
+        shm_in = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+        shm_out = shared_memory.SharedMemory(create=True, size=n_rows * 8)
+        try:
+            shared = np.ndarray(matrix.shape, dtype=np.float64, buffer=shm_in.buf)
+            shared[:] = matrix
+            del shared
+
+            executor = self._get_executor()
+            try:
+                futures = [
+                    executor.submit(
+                        _score_chunk,
+                        shm_in.name,
+                        shm_out.name,
+                        matrix.shape,
+                        columns,
+                        categories,
+                        start,
+                        stop,
+                    )
+                    for start, stop in self._chunks(n_rows)
+                ]
+                for future in futures:
+                    future.result()
+            except BrokenProcessPool:
+                self._reset_executor(executor)
+                raise
+
+            output = np.ndarray((n_rows,), dtype=np.float64, buffer=shm_out.buf)
+            probabilities = output.copy()
+            del output
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+            shm_out.close()
+            shm_out.unlink()
+
+        return probabilities
+
+    def close(self):
+        """
+        Arrête les processus workers.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_pool_backend = None
+_pool_lock = threading.Lock()
+
+
+def get_pool_backend():
+    """
+    Retourne le backend process-pool partagé (créé au premier appel).
+
+    Returns
+    -------
+    ProcessPoolBackend
+        Instance unique pour le processus courant.
+    """
+    global _pool_backend
+    with _pool_lock:
+        if _pool_backend is None:
+            _pool_backend = ProcessPoolBackend()
+            atexit.register(_pool_backend.close)
+        return _pool_backend
+
+
+def predict_positive_proba(model, X):
+    """
+    Score un lot en choisissant automatiquement le backend.
+
+    Au-delà de ``POOL_MIN_BATCH`` lignes (et si plusieurs workers sont
+    configurés) le lot est réparti sur le pool de processus ; sinon le
+    modèle chargé dans le processus courant est utilisé directement. Si
+    un worker du pool meurt pendant le lot, celui-ci est rescoré dans le
+    processus courant (le pool est recréé au lot suivant).
+
+    Parameters
+    ----------
+    model : object
+        Modèle chargé dans le processus courant.
+    X : pandas.DataFrame
+        Features alignées sur ``model.feature_names_in_``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Probabilités de la classe positive, dans l'ordre des lignes (vide
+        pour un lot vide, sans appel au modèle).
+    """
+    if len(X) == 0:
+        return np.empty(0, dtype=np.float64)
+    if POOL_MIN_BATCH > 0 and POOL_WORKERS > 1 and len(X) >= POOL_MIN_BATCH:
+        try:
+            return get_pool_backend().predict_proba(X)
+        except BrokenProcessPool as e:
+            print("⚠️ Pool d'inférence cassé, scoring in-process :", repr(e))
+    return model.predict_proba(X)[:, 1]
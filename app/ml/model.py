@@ -1,5 +1,7 @@
-import joblib
+import hashlib
 import os
+import threading
+from functools import lru_cache
 
 MODEL_PATH = os.path.join('app', 'ml', 'models', 'model_p4.joblib')
 
@@ -17,6 +19,56 @@ def load_model():
     FileNotFoundError
         Si le fichier du modèle n'existe pas à l'emplacement attendu.
     """
+    # Import différé : joblib / scikit-learn / LightGBM ne sont chargés
+    # qu'au chargement effectif du modèle
+    import joblib
+
     if not os.path.exists(MODEL_PATH):
         raise FileNotFoundError("Model P4 not found")
     return joblib.load(MODEL_PATH)
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    Retourne le modèle du processus, chargé au premier appel.
+
+    Returns
+    -------
+    object
+        Modèle partagé (voir ``load_model``).
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_model()
+    return _model
+
+
+@lru_cache(maxsize=None)
+def get_model_version():
+    """
+    Identifiant de version du modèle : empreinte SHA-256 du fichier
+    (calculée une fois par processus).
+
+    Returns
+    -------
+    str
+        12 premiers caractères hexadécimaux de l'empreinte.
+
+    Raises
+    ------
+    FileNotFoundError
+        Si le fichier du modèle n'existe pas à l'emplacement attendu.
+    """
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError("Model P4 not found")
+    digest = hashlib.sha256()
+    with open(MODEL_PATH, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
@@ -0,0 +1,209 @@
+import itertools
+import math
+import os
+
+import numpy as np
+
+from app.db.models import check_features
+from app.ml.features import DERIVED_FEATURES, EXPECTED_FEATURES, dependent_features, derive_features
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Nombre maximal de variantes scorées par appel à /whatif
+WHATIF_MAX_VARIANTS = int(os.getenv("WHATIF_MAX_VARIANTS", "1000"))
+
+
+# ============================================================
+# VARIANTES
+# ============================================================
+
+def _check_columns(columns):
+    for column in columns:
+        if column in DERIVED_FEATURES:
+            raise ValueError(f"Feature dérivée non modifiable : {column}")
+        if column not in EXPECTED_FEATURES:
+            raise ValueError(f"Feature inconnue : {column}")
+
+
+def _check_scalars(columns, values):
+    for row in values:
+        for column, value in zip(columns, row):
+            if value is not None and not isinstance(value, (str, int, float)):
+                raise ValueError(f"Valeur non scalaire pour {column} : {value!r}")
+
+
+def _grid_axes(base, grid):
+    # Une entrée de grid = un axe du produit cartésien. Valeurs scalaires :
+    # la clé est la feature ; valeurs dict : la clé n'est qu'un libellé et
+    # chaque dict fixe ensemble plusieurs features liées.
+    columns = []
+    axes = []
+    for key, entries in grid.items():
+        if len(entries) == 0:
+            raise ValueError("Chaque entrée de 'grid' doit avoir au moins une valeur")
+        linked = [isinstance(entry, dict) for entry in entries]
+        if any(linked) and not all(linked):
+            raise ValueError(f"Entrée '{key}' de 'grid' : valeurs et groupes mélangés")
+        if all(linked):
+            keys = list(dict.fromkeys(column for entry in entries for column in entry))
+            axes.append((keys, entries))
+        else:
+            keys = [key]
+            axes.append((keys, [{key: entry} for entry in entries]))
+        columns.extend(keys)
+
+    if len(set(columns)) != len(columns):
+        raise ValueError("Une feature apparaît dans plusieurs entrées de 'grid'")
+    _check_columns(columns)
+    return columns, [
+        [[entry.get(column, base[column]) for column in keys] for entry in entries]
+        for keys, entries in axes
+    ]
+
+
+def variant_values(base, grid=None, overrides=None, max_variants=WHATIF_MAX_VARIANTS):
+    """
+    Énumère les valeurs modifiées de chaque variante.
+
+    Parameters
+    ----------
+    base : dict
+        Features de base de l'employé.
+    grid : dict[str, list], optional
+        Valeurs à tester par feature : toutes les combinaisons (produit
+        cartésien) sont générées. Une entrée dont les valeurs sont des
+        dicts (clé libre) modifie ensemble des features liées (ex.
+        ``revenu_mensuel`` et ``salaire_par_annee_exp``) ; une feature
+        absente d'un dict garde sa valeur de base.
+    overrides : list[dict], optional
+        Liste explicite de variantes ; une feature absente d'une variante
+        garde sa valeur de base.
+    max_variants : int, optional
+        Nombre maximal de variantes, par défaut ``WHATIF_MAX_VARIANTS``.
+
+    Returns
+    -------
+    tuple[list[str], list[list]]
+        Features modifiées et valeurs de chaque variante (une liste par
+        variante, dans l'ordre des features).
+
+    Raises
+    ------
+    ValueError
+        Si ni ``grid`` ni ``overrides`` (ou les deux) sont fournis, si une
+        feature est inconnue, dérivée ou présente dans plusieurs entrées
+        de ``grid``, si une valeur n'est pas scalaire (liste, dict), ou si
+        le nombre de variantes dépasse ``max_variants``.
+    """
+    if (grid is None) == (overrides is None):
+        raise ValueError("Fournir soit 'grid', soit 'overrides'")
+
+    if grid is not None:
+        columns, axes = _grid_axes(base, grid)
+        count = math.prod(len(axis) for axis in axes)
+        if count > max_variants:
+            raise ValueError(f"{count} variantes demandées (maximum {max_variants})")
+        values = [
+            [value for values in combination for value in values]
+            for combination in itertools.product(*axes)
+        ]
+        _check_scalars(columns, values)
+        return columns, values
+
+    columns = list(dict.fromkeys(column for override in overrides for column in override))
+    _check_columns(columns)
+    if len(overrides) > max_variants:
+        raise ValueError(f"{len(overrides)} variantes demandées (maximum {max_variants})")
+    values = [
+        [override.get(column, base[column]) for column in columns]
+        for override in overrides
+    ]
+    _check_scalars(columns, values)
+    return columns, values
+
+
+def build_variants(base, columns, values, feature_names):
+    """
+    Construit le lot (ligne de base + variantes) à scorer.
+
+    La ligne de base est diffusée sur toutes les variantes ; seules les
+    colonnes modifiées et les features dérivées qui en dépendent sont
+    recalculées (en un passage vectorisé).
+
+    Parameters
+    ----------
+    base : dict
+        Features complètes (``EXPECTED_FEATURES``) de l'employé.
+    columns : list[str]
+        Features modifiées.
+    values : list[list]
+        Valeurs de chaque variante, dans l'ordre de ``columns``.
+    feature_names : list[str]
+        Colonnes attendues par le modèle (``model.feature_names_in_``).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Lot de ``len(values) + 1`` lignes : la ligne de base (indice 0)
+        puis les variantes, aligné sur ``feature_names``.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame([base], columns=EXPECTED_FEATURES)
+    frame = frame.iloc[np.zeros(len(values) + 1, dtype=np.int64)].reset_index(drop=True)
+
+    for j, column in enumerate(columns):
+        column_values = [base[column]] + [row[j] for row in values]
+        frame[column] = pd.Series(column_values, dtype=object).infer_objects()
+
+    derived = dependent_features(columns)
+    if derived:
+        frame[derived] = derive_features(frame)[derived]
+    return frame[feature_names]
+
+
+def validate_variants(base, columns, frame):
+    """
+    Valide la ligne de base puis les valeurs modifiées de chaque variante.
+
+    La ligne de base est validée une fois. Une variante ne diffère de la
+    base que par les colonnes modifiées et les features dérivées qui en
+    dépendent : ces seules valeurs (lues dans le lot construit) sont
+    réécrites dans une copie unique des features de base avant
+    d'appliquer les règles ; les combinaisons répétées ne sont validées
+    qu'une fois.
+
+    Parameters
+    ----------
+    base : dict
+        Features complètes (``EXPECTED_FEATURES``) de l'employé.
+    columns : list[str]
+        Features modifiées.
+    frame : pandas.DataFrame
+        Lot produit par ``build_variants`` (ligne de base en indice 0).
+
+    Raises
+    ------
+    ValueError
+        Si la ligne de base ou une variante (``Variante i : …``) est
+        invalide.
+    """
+    check_features(base)
+
+    changed = columns + dependent_features(columns)
+    features = dict(base)
+    seen = set()
+    # tolist() : scalaires Python natifs, attendus par les règles (isinstance int)
+    rows = zip(*(frame[column].tolist()[1:] for column in changed))
+    for i, row in enumerate(rows):
+        if row in seen:
+            continue
+        seen.add(row)
+        features.update(zip(changed, row))
+        try:
+            check_features(features)
+        except ValueError as e:
+            raise ValueError(f"Variante {i} : {e}")
@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from sqlalchemy import text
+
+from app.db.session import DB_MAX_OVERFLOW
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Nombre maximal de requêtes d'inférence en cours avant "not ready"
+READY_MAX_INFLIGHT = int(os.getenv("READY_MAX_INFLIGHT", "32"))
+
+# p99 maximal (ms) des dernières requêtes d'inférence
+READY_MAX_P99_MS = float(os.getenv("READY_MAX_P99_MS", "500"))
+
+# Nombre minimal de connexions DB encore disponibles dans le pool
+READY_MIN_POOL_HEADROOM = int(os.getenv("READY_MIN_POOL_HEADROOM", "1"))
+
+# Fenêtre (s) des latences prises en compte dans les percentiles
+LATENCY_WINDOW_S = float(os.getenv("LATENCY_WINDOW_S", "60"))
+
+# Nombre maximal de latences conservées dans la fenêtre (borne mémoire)
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "1000"))
+
+
+# ============================================================
+# CHARGE D'INFÉRENCE
+# ============================================================
+
+class LoadTracker:
+    """
+    Suit la file d'inférence : requêtes en cours et latences récentes.
+
+    Les latences sont horodatées ; seules celles des ``window_s``
+    dernières secondes comptent dans les percentiles, de sorte qu'un pic
+    passé cesse de peser sur la readiness.
+
+    Parameters
+    ----------
+    window_s : float, optional
+        Durée de la fenêtre en secondes, par défaut ``LATENCY_WINDOW_S``.
+    max_samples : int, optional
+        Nombre maximal de latences conservées, par défaut ``LATENCY_WINDOW``.
+    clock : callable, optional
+        Horloge monotone en secondes, par défaut ``time.monotonic``.
+    """
+
+    def __init__(self, window_s=LATENCY_WINDOW_S, max_samples=LATENCY_WINDOW, clock=time.monotonic):
+        self.inflight = 0
+        self.window_s = window_s
+        self._clock = clock
+        self._latencies = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        # Appelé sous verrou : les latences sont en ordre d'arrivée
+        while self._latencies and self._latencies[0][0] < now - self.window_s:
+            self._latencies.popleft()
+
+    def start(self):
+        with self._lock:
+            self.inflight += 1
+
+    def finish(self, elapsed_ms):
+        with self._lock:
+            now = self._clock()
+            self.inflight -= 1
+            self._latencies.append((now, elapsed_ms))
+            self._expire(now)
+
+    def snapshot(self):
+        """
+        Photographie de la charge courante.
+
+        Returns
+        -------
+        dict
+            'inflight', 'samples', 'p50_ms' et 'p99_ms' sur la fenêtre
+            courante (None si aucune requête dans la fenêtre).
+        """
+        with self._lock:
+            self._expire(self._clock())
+            inflight = self.inflight
+            latencies = np.array([ms for _, ms in self._latencies], dtype=np.float64)
+        if latencies.size:
+            p50, p99 = np.percentile(latencies, [50, 99])
+            p50, p99 = float(p50), float(p99)
+        else:
+            p50 = p99 = None
+        return {
+            "inflight": inflight,
+            "samples": int(latencies.size),
+            "p50_ms": p50,
+            "p99_ms": p99,
+        }
+
+
+# ============================================================
+# BASE DE DONNÉES
+# ============================================================
+
+def database_status(db, max_overflow=DB_MAX_OVERFLOW):
+    """
+    Mesure la marge du pool de connexions puis vérifie que la base répond.
+
+    La marge est lue avant la sonde : si le pool est épuisé, la sonde
+    n'est pas lancée (elle attendrait ``pool_timeout`` une connexion) et
+    ``reachable`` vaut None.
+
+    Parameters
+    ----------
+    db : Session
+        Session SQLAlchemy.
+    max_overflow : int, optional
+        Débordement autorisé du pool (négatif : illimité), par défaut
+        ``DB_MAX_OVERFLOW``.
+
+    Returns
+    -------
+    dict
+        'reachable' et, si le pool l'expose, 'pool_size', 'checked_out',
+        'overflow' et 'headroom' (connexions encore disponibles).
+    """
+    status = {}
+    pool = db.get_bind().pool
+    if hasattr(pool, "checkedout") and hasattr(pool, "size"):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        headroom = None if max_overflow < 0 else size + max_overflow - checked_out
+        status.update({
+            "pool_size": size,
+            "checked_out": checked_out,
+            "overflow": pool.overflow(),
+            "headroom": headroom,
+        })
+        if headroom is not None and headroom < READY_MIN_POOL_HEADROOM:
+            return {"reachable": None, **status}
+
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"reachable": False, "error": type(e).__name__, **status}
+    return {"reachable": True, **status}
+
+
+# ============================================================
+# READINESS
+# ============================================================
+
+def readiness(model_warm, db_status, load, db_required=True):
+    """
+    Évalue la readiness à partir de l'état du modèle, de la base et de la charge.
+
+    Parameters
+    ----------
+    model_warm : bool
+        Modèle chargé et préchauffé.
+    db_status : dict
+        Résultat de ``database_status``.
+    load : dict
+        Résultat de ``LoadTracker.snapshot``.
+    db_required : bool, optional
+        La base conditionne la readiness, par défaut True. False (backend
+        ``segment_log``) : l'état de la base est informatif.
+
+    Returns
+    -------
+    dict
+        'ready', 'reasons' (checks en échec), 'saturation' (ratio de
+        charge le plus élevé par rapport aux seuils) et 'thresholds'.
+    """
+    reasons = []
+    if not model_warm:
+        reasons.append("model_not_warm")
+    if db_required:
+        # reachable None : sonde non lancée (pool épuisé)
+        if db_status["reachable"] is False:
+            reasons.append("db_unreachable")
+        headroom = db_status.get("headroom")
+        if headroom is not None and headroom < READY_MIN_POOL_HEADROOM:
+            reasons.append("db_pool_exhausted")
+    if load["inflight"] > READY_MAX_INFLIGHT:
+        reasons.append("inference_queue_full")
+    if load["p99_ms"] is not None and load["p99_ms"] > READY_MAX_P99_MS:
+        reasons.append("p99_latency_high")
+
+    ratios = [load["inflight"] / READY_MAX_INFLIGHT if READY_MAX_INFLIGHT > 0 else 0.0]
+    if load["p99_ms"] is not None and READY_MAX_P99_MS > 0:
+        ratios.append(load["p99_ms"] / READY_MAX_P99_MS)
+
+    return {
+        "ready": not reasons,
+        "reasons": reasons,
+        "saturation": max(ratios),
+        "thresholds": {
+            "max_inflight": READY_MAX_INFLIGHT,
+            "max_p99_ms": READY_MAX_P99_MS,
+            "min_pool_headroom": READY_MIN_POOL_HEADROOM,
+        },
+    }
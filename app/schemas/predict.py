@@ -1,9 +1,92 @@
-from pydantic import BaseModel
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Annotated, Dict, Any, List, Optional
+
+# Identifiant d'employé : longueur de la colonne employee_scores.employee_id
+EmployeeId = Annotated[str, Field(max_length=64)]
 
 class PredictRequest(BaseModel):
     features: Dict[str, Any]
+    # Mode "raw" : seules les features de base sont envoyées,
+    # les features dérivées sont calculées par l'API
+    raw: bool = False
+    # Identifiant optionnel : alimente la table des scores (/scores/{id})
+    employee_id: Optional[EmployeeId] = None
+    # Mode "decision only" : seule la prédiction est calculée (sortie
+    # anticipée du boosting), la probabilité n'est pas renvoyée
+    decision_only: bool = False
 
 class PredictResponse(BaseModel):
     prediction: int
     probability: float | None = None
+    # Nombre d'arbres évalués (mode "decision only")
+    trees_evaluated: Optional[int] = None
+
+class PredictBatchRequest(BaseModel):
+    rows: List[Dict[str, Any]]
+    raw: bool = False
+    # Un identifiant (ou None) par ligne
+    employee_ids: Optional[List[Optional[EmployeeId]]] = None
+    decision_only: bool = False
+
+class PredictBatchResponse(BaseModel):
+    results: List[PredictResponse]
+    # Moyenne des arbres évalués par ligne (mode "decision only")
+    mean_trees_evaluated: Optional[float] = None
+
+class PredictColumnarRequest(BaseModel):
+    # Format positionnel : noms de colonnes une seule fois + lignes
+    columns: List[str]
+    rows: List[List[Any]]
+    raw: bool = False
+    decision_only: bool = False
+
+class PredictColumnarResponse(BaseModel):
+    prediction: List[int]
+    probability: List[Optional[float]]
+    mean_trees_evaluated: Optional[float] = None
+
+class WhatIfRequest(BaseModel):
+    # Features de base de l'employé (toutes, ou BASE_FEATURES en mode raw)
+    features: Dict[str, Any]
+    raw: bool = False
+    # Soit une grille (produit cartésien des valeurs par feature ; des
+    # valeurs dict modifient ensemble des features liées), soit une liste
+    # explicite de variantes
+    grid: Optional[Dict[str, List[Any]]] = None
+    overrides: Optional[List[Dict[str, Any]]] = None
+
+class WhatIfResponse(BaseModel):
+    base_prediction: int
+    base_probability: float
+    # Tableau compact : une ligne de "values" par variante
+    columns: List[str]
+    values: List[List[Any]]
+    prediction: List[int]
+    probability: List[float]
+
+class ScoreResponse(BaseModel):
+    employee_id: str
+    prediction: int
+    probability: float | None = None
+    model_version: str
+    scored_at: datetime
+    # "index", "table" ou "live"
+    source: str
+
+class StatsGroup(BaseModel):
+    value: str
+    # Jour agrégé (None : période entière)
+    bucket: Optional[date] = None
+    count: int
+    positives: int
+    churn_rate: Optional[float] = None
+    # None si aucune probabilité (mode "decision only")
+    mean_probability: Optional[float] = None
+    histogram: List[int]
+
+class StatsResponse(BaseModel):
+    dimension: str
+    start: Optional[date] = None
+    end: Optional[date] = None
+    groups: List[StatsGroup]
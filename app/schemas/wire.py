@@ -0,0 +1,101 @@
+# pandas / pyarrow sont importés à l'usage : ce module est chargé au
+# démarrage de l'API mais les formats columnaires sont optionnels.
+
+# Content-Type des flux Arrow IPC (format "stream")
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+# ============================================================
+# DÉCODAGE
+# ============================================================
+
+def decode_columnar(columns, rows):
+    """
+    Construit un DataFrame depuis un corps positionnel (en-tête + lignes).
+
+    Les noms de colonnes ne sont transmis qu'une fois ; aucune ligne
+    n'est convertie en dictionnaire.
+
+    Parameters
+    ----------
+    columns : list[str]
+        Noms des colonnes, dans l'ordre des valeurs de chaque ligne.
+    rows : list[list]
+        Valeurs de chaque ligne.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Lot de features.
+
+    Raises
+    ------
+    ValueError
+        Si l'en-tête contient des doublons ou si une ligne n'a pas le
+        bon nombre de valeurs.
+    """
+    import pandas as pd
+
+    if len(set(columns)) != len(columns):
+        raise ValueError("Colonnes dupliquées dans l'en-tête")
+    for i, row in enumerate(rows):
+        if len(row) != len(columns):
+            raise ValueError(
+                f"Ligne {i} : {len(row)} valeurs pour {len(columns)} colonnes"
+            )
+    return pd.DataFrame(rows, columns=columns)
+
+
+def decode_arrow(body):
+    """
+    Construit un DataFrame depuis un flux Arrow IPC.
+
+    Parameters
+    ----------
+    body : bytes
+        Corps de la requête (format Arrow IPC "stream").
+
+    Returns
+    -------
+    pandas.DataFrame
+        Lot de features.
+
+    Raises
+    ------
+    ValueError
+        Si le corps n'est pas un flux Arrow valide.
+    """
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Flux Arrow invalide : {e}")
+    return table.to_pandas()
+
+
+# ============================================================
+# ENCODAGE
+# ============================================================
+
+def encode_arrow(columns):
+    """
+    Sérialise des colonnes de résultats en flux Arrow IPC.
+
+    Parameters
+    ----------
+    columns : dict
+        {nom: tableau de valeurs}.
+
+    Returns
+    -------
+    bytes
+        Flux Arrow IPC.
+    """
+    import pyarrow as pa
+
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
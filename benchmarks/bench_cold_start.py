@@ -0,0 +1,118 @@
+"""
+Benchmark de démarrage à froid : lancement du processus jusqu'au premier
+``/predict`` réussi.
+
+Démarre ``uvicorn app.main:app`` dans un processus neuf, interroge
+``/predict`` jusqu'à la première réponse 200 et mesure le délai. Le
+script échoue si la médiane dépasse le budget (``--budget-s`` ou
+``COLD_START_BUDGET_S``) ; ``--output`` ajoute chaque mesure à un
+fichier JSON lines pour suivre l'évolution.
+
+Par défaut le serveur tourne avec ``ENV=test`` (pas de persistance),
+pour ne pas dépendre de PostgreSQL.
+
+Usage ::
+
+    python -m benchmarks.bench_cold_start --runs 5 --budget-s 6
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from benchmarks.common import BASE_ROW
+
+# Référence mesurée : médiane 3.7 s (5 démarrages, ENV=test) ; budget =
+# référence + 60 % de marge pour la variance des runners CI
+COLD_START_BUDGET_S = float(os.getenv("COLD_START_BUDGET_S", "6"))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def cold_start(timeout, env):
+    """
+    Mesure un démarrage à froid.
+
+    Parameters
+    ----------
+    timeout : float
+        Délai maximal (s) avant d'abandonner.
+    env : dict
+        Variables d'environnement du serveur.
+
+    Returns
+    -------
+    float
+        Secondes entre le lancement du processus et le premier /predict 200.
+    """
+    port = free_port()
+    body = json.dumps({"features": BASE_ROW}).encode()
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/predict",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"le serveur s'est arrêté (code {server.returncode})")
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.02)
+        raise TimeoutError(f"pas de /predict réussi en {timeout} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-s", type=float, default=COLD_START_BUDGET_S)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    env = {**os.environ, "ENV": os.getenv("ENV", "test")}
+    durations = [cold_start(args.timeout, env) for _ in range(args.runs)]
+    median = statistics.median(durations)
+
+    print(f"cold start (s) : {' '.join(f'{d:.2f}' for d in durations)}")
+    print(f"médiane        : {median:.2f} s (budget {args.budget_s:.2f} s)")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "durations_s": durations,
+                "median_s": median,
+                "budget_s": args.budget_s,
+            }) + "\n")
+
+    if median > args.budget_s:
+        print("ÉCHEC : démarrage à froid au-delà du budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark du scoring "decision only" (sortie anticipée du boosting).
+
+Compare ``predict_proba`` complet au ``DecisionScorer`` pour plusieurs
+tailles de bloc : temps, débit, arbres évalués en moyenne par ligne et
+parité des décisions avec le modèle complet.
+
+Usage ::
+
+    python -m benchmarks.bench_early_exit --rows 20000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from app.ml.model import load_model
+from app.ml.early_exit import DecisionScorer
+from benchmarks.common import make_rows, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[10, 25, 50, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = load_model()
+    X = pd.DataFrame(make_rows(args.rows), columns=model.feature_names_in_)
+
+    expected = (model.predict_proba(X)[:, 1] >= 0.5).astype(int)
+    baseline = timeit(lambda: model.predict_proba(X), args.repeat)
+    print(f"rows={args.rows}")
+    print(f"{'scorer':<16}{'seconds':>10}{'rows/s':>12}{'speedup':>10}{'trees/row':>12}{'parity':>8}")
+    print(f"{'predict_proba':<16}{baseline:>10.3f}{args.rows / baseline:>12.0f}{1.0:>10.2f}{'-':>12}{'-':>8}")
+
+    for block_size in args.blocks:
+        scorer = DecisionScorer(model, block_size)
+        decisions, trees_evaluated = scorer.decide(X)
+        parity = bool(np.array_equal(decisions, expected))
+        elapsed = timeit(lambda: scorer.decide(X), args.repeat)
+        print(
+            f"{f'block {block_size}':<16}{elapsed:>10.3f}{args.rows / elapsed:>12.0f}"
+            f"{baseline / elapsed:>10.2f}{trees_evaluated.mean():>12.1f}{str(parity):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
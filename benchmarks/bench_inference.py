@@ -0,0 +1,54 @@
+"""
+Benchmark du backend d'inférence process-pool.
+
+Compare le scoring in-process au pool de processus pour plusieurs
+nombres de workers et affiche le débit ainsi que l'efficacité de
+passage à l'échelle (accélération / nombre de workers).
+
+Usage ::
+
+    python -m benchmarks.bench_inference --rows 50000
+"""
+import argparse
+
+import pandas as pd
+
+from app.ml.model import load_model
+from app.ml.inference import ProcessPoolBackend, available_cpus
+from benchmarks.common import make_rows, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--max-workers", type=int, default=available_cpus())
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = load_model()
+    X = pd.DataFrame(make_rows(args.rows), columns=model.feature_names_in_)
+
+    baseline = timeit(lambda: model.predict_proba(X), args.repeat)
+    print(f"rows={args.rows} cpus={available_cpus()}")
+    print(f"{'backend':<16}{'seconds':>10}{'rows/s':>12}{'speedup':>10}{'efficiency':>12}")
+    print(f"{'in-process':<16}{baseline:>10.3f}{args.rows / baseline:>12.0f}{1.0:>10.2f}{'-':>12}")
+
+    workers = 1
+    while workers <= args.max_workers:
+        backend = ProcessPoolBackend(workers=workers)
+        try:
+            # Premier appel : démarrage des workers et chargement du modèle
+            backend.predict_proba(X.head(workers))
+            elapsed = timeit(lambda: backend.predict_proba(X), args.repeat)
+        finally:
+            backend.close()
+        speedup = baseline / elapsed
+        print(
+            f"{f'pool x{workers}':<16}{elapsed:>10.3f}{args.rows / elapsed:>12.0f}"
+            f"{speedup:>10.2f}{speedup / workers:>12.2f}"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
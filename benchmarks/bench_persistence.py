@@ -0,0 +1,92 @@
+"""
+Benchmark des backends de persistance, sans PostgreSQL.
+
+Plusieurs threads enregistrent chacun des prédictions une par une
+(comme des requêtes /predict concurrentes) ; le script affiche le débit
+et la latence p50 / p99 d'un ``save`` pour :
+
+- ``SqlBackend`` sur une base SQLite fichier ;
+- ``SegmentLogBackend`` (journal local avec group commit fsync).
+
+Usage ::
+
+    python -m benchmarks.bench_persistence --records 2000 --threads 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base
+from app.db.persistence import SegmentLogBackend, SqlBackend, prediction_record
+from benchmarks.common import make_rows
+
+
+def run(backend, session_factory, rows, threads):
+    latencies = []
+    lock = threading.Lock()
+    per_thread = len(rows) // threads
+
+    def worker(chunk):
+        db = session_factory() if session_factory else None
+        local = []
+        try:
+            for row in chunk:
+                start = time.perf_counter()
+                backend.save(db, [prediction_record(row, 0, 0.1)])
+                local.append(time.perf_counter() - start)
+        finally:
+            if db is not None:
+                db.close()
+        with lock:
+            latencies.extend(local)
+
+    workers = [
+        threading.Thread(target=worker, args=(rows[i * per_thread:(i + 1) * per_thread],))
+        for i in range(threads)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    return len(latencies) / elapsed, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    rows = make_rows(args.records)
+    print(f"records={args.records} threads={args.threads}")
+    print(f"{'backend':<16}{'records/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            connect_args={"check_same_thread": False, "timeout": 60},
+        )
+        Base.metadata.create_all(engine)
+        result = run(SqlBackend(), sessionmaker(bind=engine), rows, args.threads)
+        print(f"{'sql (sqlite)':<16}{result[0]:>12.0f}{result[1]:>10.2f}{result[2]:>10.2f}")
+
+        backend = SegmentLogBackend(os.path.join(tmp, "segments"))
+        try:
+            result = run(backend, None, rows, args.threads)
+        finally:
+            backend.close()
+        print(f"{'segment_log':<16}{result[0]:>12.0f}{result[1]:>10.2f}{result[2]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark des formats d'entrée du scoring par lot.
+
+Compare, pour un même lot, la taille du corps de requête et le temps de
+décodage jusqu'à la matrice d'entrée du modèle (ordre
+``model.feature_names_in_``) :
+
+- JSON ``PredictBatchRequest`` (un dictionnaire par ligne) ;
+- JSON positionnel ``PredictColumnarRequest`` (en-tête + lignes) ;
+- flux Arrow IPC.
+
+Usage ::
+
+    python -m benchmarks.bench_wire_formats --rows 10000
+"""
+import argparse
+import json
+
+import pandas as pd
+import pyarrow as pa
+
+from app.ml.features import EXPECTED_FEATURES
+from app.ml.model import load_model
+from app.schemas.predict import PredictBatchRequest, PredictColumnarRequest
+from app.schemas.wire import decode_arrow, decode_columnar, encode_arrow
+from benchmarks.common import make_rows, timeit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    columns = load_model().feature_names_in_
+    rows = make_rows(args.rows)
+
+    dict_body = json.dumps({"rows": rows}).encode()
+    columnar_body = json.dumps({
+        "columns": EXPECTED_FEATURES,
+        "rows": [[row[c] for c in EXPECTED_FEATURES] for row in rows],
+    }).encode()
+    table = pa.Table.from_pylist(rows)
+    arrow_body = encode_arrow({name: table[name] for name in table.column_names})
+
+    def decode_dicts():
+        request = PredictBatchRequest.model_validate_json(dict_body)
+        data = [{f: r[f] for f in EXPECTED_FEATURES} for r in request.rows]
+        return pd.DataFrame(data, columns=columns)
+
+    def decode_positional():
+        request = PredictColumnarRequest.model_validate_json(columnar_body)
+        return decode_columnar(request.columns, request.rows)[columns]
+
+    def decode_stream():
+        return decode_arrow(arrow_body)[columns]
+
+    print(f"rows={args.rows}")
+    print(f"{'format':<20}{'bytes':>12}{'bytes/row':>12}{'decode ms':>12}")
+    for name, body, decode in [
+        ("json dicts", dict_body, decode_dicts),
+        ("json positional", columnar_body, decode_positional),
+        ("arrow ipc", arrow_body, decode_stream),
+    ]:
+        elapsed = timeit(decode, args.repeat)
+        print(f"{name:<20}{len(body):>12}{len(body) / args.rows:>12.1f}{elapsed * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
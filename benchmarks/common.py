@@ -0,0 +1,99 @@
+"""
+Utilitaires partagés par les scripts de benchmark.
+"""
+import time
+
+import numpy as np
+
+
+BASE_ROW = {
+    "age": 35,
+    "age_debut_carriere": 23,
+    "annee_experience_totale": 12,
+    "annees_dans_l_entreprise": 5,
+    "annees_dans_le_poste_actuel": 3,
+    "annees_depuis_la_derniere_promotion": 2,
+    "annee_derniere_promotion": 2024,
+    "annes_sous_responsable_actuel": 2,
+    "genre": 1,
+    "statut_marital": "Célibataire",
+    "niveau_education": 3,
+    "domaine_etude": "Infra & Cloud",
+    "departement": "Consulting",
+    "poste": "Consultant",
+    "niveau_hierarchique_poste": 2,
+    "frequence_deplacement": 1,
+    "revenu_mensuel": 3000,
+    "augementation_salaire_precedente": 5,
+    "salaire_par_annee_exp": 36000,
+    "heure_supplementaires": 1,
+    "distance_domicile_travail": 15,
+    "distance_x_deplacement": 15,
+    "impact_trajet_sur_satisfaction": 2,
+    "note_evaluation_actuelle": 4,
+    "note_evaluation_precedente": 3,
+    "evolution_note": 1,
+    "satisfaction_employee_nature_travail": 3,
+    "satisfaction_employee_environnement": 3,
+    "satisfaction_employee_equilibre_pro_perso": 3,
+    "satisfaction_employee_equipe": 3,
+    "satisfaction_moyenne": 3,
+    "score_satisfaction_global": 3,
+    "delta_satisfaction_equipe": 0,
+    "stagnation_poste": 0,
+    "stagnation_profonde": 0,
+    "taux_volatilite": 0.2,
+    "ratio_fidelite_entreprise": 0.6,
+    "ratio_poste_vs_anciennete": 0.5,
+    "anciennete_x_satisfaction": 10,
+    "nombre_experiences_precedentes": 2,
+    "nb_formations_suivies": 4,
+    "formations_par_annee": 1,
+    "nombre_participation_pee": 1,
+}
+
+
+def make_rows(n, seed=0):
+    """
+    Génère ``n`` lignes de features en perturbant ``BASE_ROW``.
+
+    Parameters
+    ----------
+    n : int
+        Nombre de lignes.
+    seed : int, optional
+        Graine du générateur aléatoire, par défaut 0.
+
+    Returns
+    -------
+    list[dict]
+        Lignes de features au format attendu par ``/predict``.
+    """
+    rng = np.random.default_rng(seed)
+    ages = rng.integers(35, 60, size=n)
+    revenus = rng.integers(1500, 12000, size=n)
+    distances = rng.integers(1, 30, size=n)
+    heures_sup = rng.integers(0, 2, size=n)
+    rows = []
+    for age, revenu, distance, hs in zip(ages, revenus, distances, heures_sup):
+        row = dict(BASE_ROW)
+        row["age"] = int(age)
+        row["revenu_mensuel"] = int(revenu)
+        row["salaire_par_annee_exp"] = int(revenu) * 12
+        row["distance_domicile_travail"] = int(distance)
+        row["distance_x_deplacement"] = int(distance)
+        row["heure_supplementaires"] = int(hs)
+        rows.append(row)
+    return rows
+
+
+def timeit(func, repeat=3):
+    """
+    Exécute ``func`` ``repeat`` fois et retourne le meilleur temps (s).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,108 @@
+"""
+Rapport du temps d'import d'un module (``python -X importtime``).
+
+Importe le module dans ``--runs`` processus neufs et affiche les imports
+les plus coûteux (temps cumulé et propre) de la mesure médiane. Le script
+échoue si la médiane du temps d'import total dépasse le budget
+(``--budget-ms`` ou ``IMPORT_TIME_BUDGET_MS``) ; ``--output`` ajoute
+chaque mesure à un fichier JSON lines pour suivre l'évolution.
+
+Usage ::
+
+    python -m benchmarks.importtime --module app.main --runs 5 --budget-ms 1800
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+# Budget (ms) du temps d'import ; non défini : rapport seul
+IMPORT_TIME_BUDGET_MS = os.getenv("IMPORT_TIME_BUDGET_MS")
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def importtime(module):
+    """
+    Mesure les imports déclenchés par ``import module``.
+
+    Parameters
+    ----------
+    module : str
+        Nom du module à importer.
+
+    Returns
+    -------
+    list[tuple[str, int, int, int]]
+        (module, temps propre µs, temps cumulé µs, profondeur), dans
+        l'ordre de la sortie de ``-X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def total_ms(entries, module):
+    return next(c for name, _, c, _ in reversed(entries) if name == module) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(IMPORT_TIME_BUDGET_MS) if IMPORT_TIME_BUDGET_MS else None,
+    )
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    runs = sorted(
+        (importtime(args.module) for _ in range(args.runs)),
+        key=lambda entries: total_ms(entries, args.module),
+    )
+    durations = [total_ms(entries, args.module) for entries in runs]
+    median = statistics.median(durations)
+    entries = runs[len(runs) // 2]
+
+    print(f"{args.module}: {median:.0f} ms médian ({len(entries)} modules)")
+    print(f"mesures (ms) : {' '.join(f'{d:.0f}' for d in durations)}")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    # Imports de premier niveau (profondeur 1) : ce que le module tire directement
+    top_level = [e for e in entries if e[3] <= 1 and e[0] != args.module]
+    for name, self_us, cumulative_us, _ in sorted(top_level, key=lambda e: -e[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "module": args.module,
+                "durations_ms": durations,
+                "median_ms": median,
+                "budget_ms": args.budget_ms,
+            }) + "\n")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"ÉCHEC : {median:.0f} ms > budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
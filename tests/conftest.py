@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import Base
+from app.ml.model import load_model
+
+
+# ---------- BASE SQLITE EN MÉMOIRE ----------
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+# ---------- FIXTURE DE BASE VALIDE ----------
+@pytest.fixture
+def valid_features():
+    current_year = datetime.now(timezone.utc).year
+    return {
+        "age": 35,
+        "age_debut_carriere": 23,
+        "annee_experience_totale": 12,
+        "annees_dans_l_entreprise": 5,
+        "annees_dans_le_poste_actuel": 3,
+        "annees_depuis_la_derniere_promotion": 2,
+        "annee_derniere_promotion": current_year - 2,
+        "annes_sous_responsable_actuel": 2,
+        "genre": 1,
+        "statut_marital": "Celibataire",
+        "niveau_education": 3,
+        "domaine_etude": "Informatique",
+        "departement": "IT",
+        "poste": "Developpeur",
+        "niveau_hierarchique_poste": 2,
+        "frequence_deplacement": 1,
+        "revenu_mensuel": 3000,
+        "augementation_salaire_precedente": 5,
+        "salaire_par_annee_exp": 36000,
+        "heure_supplementaires": 1,
+        "distance_domicile_travail": 15,
+        "distance_x_deplacement": 30,
+        "impact_trajet_sur_satisfaction": 2,
+        "note_evaluation_actuelle": 4,
+        "note_evaluation_precedente": 3,
+        "evolution_note": 1,
+        "satisfaction_employee_nature_travail": 3,
+        "satisfaction_employee_environnement": 3,
+        "satisfaction_employee_equilibre_pro_perso": 3,
+        "satisfaction_employee_equipe": 3,
+        "satisfaction_moyenne": 3,
+        "score_satisfaction_global": 3,
+        "delta_satisfaction_equipe": 0,
+        "stagnation_poste": 0,
+        "stagnation_profonde": 0,
+        "taux_volatilite": 0.2,
+        "ratio_fidelite_entreprise": 0.6,
+        "ratio_poste_vs_anciennete": 0.5,
+        "anciennete_x_satisfaction": 10,
+        "nombre_experiences_precedentes": 2,
+        "nb_formations_suivies": 4,
+        "formations_par_annee": 1,
+        "nombre_participation_pee": 1,
+    }
+
+
+# ---------- MODÈLE ET LOTS DE FEATURES ALÉATOIRES ----------
+@pytest.fixture(scope="session")
+def model():
+    return load_model()
+
+
+@pytest.fixture
+def make_batch(model):
+    def make(n, seed=0):
+        rng = np.random.default_rng(seed)
+        data = {}
+        for column in model.feature_names_in_:
+            data[column] = rng.integers(0, 5, size=n)
+        data["revenu_mensuel"] = rng.integers(1500, 9000, size=n)
+        data["statut_marital"] = rng.choice(["Célibataire", "Marié(e)", "Divorcé(e)"], size=n)
+        data["departement"] = rng.choice(["Commercial", "Consulting", "Inconnu"], size=n)
+        data["poste"] = rng.choice(["Manager", "Consultant", "Tech Lead"], size=n)
+        data["domaine_etude"] = rng.choice(["Autre", "Marketing"], size=n)
+        return pd.DataFrame(data, columns=model.feature_names_in_)
+    return make
+
+
+@pytest.fixture
+def batch(make_batch):
+    return make_batch(64)
@@ -1,18 +1,29 @@
+import pyarrow as pa
 import pytest
 from fastapi.testclient import TestClient
 from datetime import datetime, timezone
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.db.models import Base
+from sqlalchemy.pool import StaticPool
+from app.db.models import Base, EmployeeScore
+from app.db.persistence import SqlBackend, prediction_record
+from app.db.scores import features_hash, rescore_stale, score_index
 from app.db.session import get_db
-from app.main import app
+from app import main
+from app.main import app, state
+from app.monitoring import LoadTracker
+from app.ml import early_exit
+from app.ml.model import get_model, get_model_version
+from app.ml.features import DERIVED_FEATURES, EXPECTED_FEATURES
+from app.schemas.wire import ARROW_STREAM_MEDIA_TYPE, decode_arrow, encode_arrow
 
 # --- DB SQLITE EN MÉMOIRE POUR LES TESTS ---
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
 )
 
 TestingSessionLocal = sessionmaker(bind=engine)
@@ -187,3 +198,489 @@ def test_predict_invalid_age(features_non_churn):
     response = client.post("/predict", json={"features": payload})
     assert response.status_code == 400
     assert "age hors plage" in response.json()["detail"]
+
+
+# ---------- PREDICT BATCH ----------
+def test_predict_batch_keeps_order(features_non_churn, features_churn):
+    rows = [features_churn, features_non_churn, features_churn]
+    response = client.post("/predict/batch", json={"rows": rows})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [r["prediction"] for r in results] == [1, 0, 1]
+    for r in results:
+        assert 0 <= r["probability"] <= 1
+
+
+def test_predict_batch_empty():
+    for decision_only in (False, True):
+        response = client.post("/predict/batch", json={"rows": [], "decision_only": decision_only})
+        assert response.status_code == 200
+        assert response.json()["results"] == []
+
+        response = client.post(
+            "/predict/batch/columnar",
+            json={"columns": EXPECTED_FEATURES, "rows": [], "decision_only": decision_only},
+        )
+        assert response.status_code == 200
+        assert response.json()["prediction"] == []
+
+
+def test_predict_batch_missing_feature(features_non_churn):
+    payload = features_non_churn.copy()
+    del payload["age"]
+
+    response = client.post("/predict/batch", json={"rows": [features_non_churn, payload]})
+    assert response.status_code == 400
+    assert "Ligne 1" in response.json()["detail"]
+
+
+# ---------- MODE RAW (FEATURES DÉRIVÉES CÔTÉ SERVEUR) ----------
+def _raw(features):
+    return {k: v for k, v in features.items() if k not in DERIVED_FEATURES}
+
+
+def test_predict_raw_matches_full_payload(features_non_churn, features_churn):
+    # Parité sur les charges utiles complètes, non modifiées
+    for features in (features_non_churn, features_churn):
+        full = client.post("/predict", json={"features": features}).json()
+        derived = client.post("/predict", json={"features": _raw(features), "raw": True}).json()
+
+        assert derived == full
+
+
+def test_predict_batch_raw_matches_full_payload(features_non_churn, features_churn):
+    rows = [features_non_churn, features_churn]
+    # Les valeurs dérivées envoyées en mode raw sont ignorées
+    incoherent = {**_raw(features_churn), "evolution_note": 4, "satisfaction_moyenne": 0}
+
+    full = client.post("/predict/batch", json={"rows": rows}).json()
+    derived = client.post(
+        "/predict/batch",
+        json={"rows": [_raw(row) for row in rows] + [incoherent], "raw": True},
+    )
+    assert derived.status_code == 200
+
+    results = derived.json()["results"]
+    assert results == full["results"] + [full["results"][1]]
+
+
+def test_predict_raw_missing_base_feature(features_non_churn):
+    raw = _raw(features_non_churn)
+    del raw["revenu_mensuel"]
+
+    response = client.post("/predict", json={"features": raw, "raw": True})
+    assert response.status_code == 400
+    assert "revenu_mensuel" in response.json()["detail"]
+
+
+# ---------- FORMATS COLUMNAIRES ----------
+def test_predict_batch_columnar(features_non_churn, features_churn):
+    columns = list(features_churn)
+    rows = [[f[c] for c in columns] for f in (features_churn, features_non_churn)]
+
+    response = client.post("/predict/batch/columnar", json={"columns": columns, "rows": rows})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["prediction"] == [1, 0]
+    expected = client.post(
+        "/predict/batch", json={"rows": [features_churn, features_non_churn]}
+    ).json()["results"]
+    assert data["probability"] == pytest.approx([r["probability"] for r in expected])
+
+
+def test_predict_batch_columnar_bad_row_length(features_non_churn):
+    columns = list(features_non_churn)
+    rows = [[features_non_churn[c] for c in columns][:-1]]
+
+    response = client.post("/predict/batch/columnar", json={"columns": columns, "rows": rows})
+    assert response.status_code == 400
+    assert "Ligne 0" in response.json()["detail"]
+
+
+def test_predict_batch_arrow(features_non_churn, features_churn):
+    table = pa.Table.from_pylist([features_churn, features_non_churn])
+    body = encode_arrow({name: table[name] for name in table.column_names})
+
+    response = client.post(
+        "/predict/batch/arrow",
+        content=body,
+        headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+
+    result = decode_arrow(response.content)
+    assert result["prediction"].tolist() == [1, 0]
+    assert ((result["probability"] >= 0) & (result["probability"] <= 1)).all()
+
+
+def test_predict_batch_arrow_invalid_body():
+    response = client.post(
+        "/predict/batch/arrow",
+        content=b"not arrow",
+        headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+    )
+    assert response.status_code == 400
+
+
+# ---------- MODE DECISION ONLY ----------
+def test_predict_decision_only(features_non_churn, features_churn):
+    for features, expected in ((features_non_churn, 0), (features_churn, 1)):
+        response = client.post("/predict", json={"features": features, "decision_only": True})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["prediction"] == expected
+        assert data["probability"] is None
+        assert 1 <= data["trees_evaluated"] <= 500
+
+
+def test_predict_batch_decision_only(features_non_churn, features_churn):
+    rows = [features_churn, features_non_churn, features_churn]
+    full = client.post("/predict/batch", json={"rows": rows}).json()
+    response = client.post("/predict/batch", json={"rows": rows, "decision_only": True})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert [r["prediction"] for r in data["results"]] == [r["prediction"] for r in full["results"]]
+    assert all(r["probability"] is None for r in data["results"])
+    assert 1 <= data["mean_trees_evaluated"] <= 500
+
+
+def test_decision_only_rejects_employee_ids(features_churn):
+    client.post("/predict", json={"features": features_churn, "employee_id": "E-050"})
+
+    response = client.post(
+        "/predict",
+        json={"features": features_churn, "employee_id": "E-050", "decision_only": True},
+    )
+    assert response.status_code == 400
+    assert "employee_id" in response.json()["detail"]
+
+    response = client.post(
+        "/predict/batch",
+        json={"rows": [features_churn], "employee_ids": ["E-050"], "decision_only": True},
+    )
+    assert response.status_code == 400
+
+    # Le dernier score complet reste servi
+    assert client.get("/scores/E-050").json()["probability"] is not None
+
+
+def test_predict_batch_arrow_decision_only(features_non_churn, features_churn):
+    table = pa.Table.from_pylist([features_churn, features_non_churn])
+    body = encode_arrow({name: table[name] for name in table.column_names})
+
+    response = client.post(
+        "/predict/batch/arrow?decision_only=true",
+        content=body,
+        headers={"Content-Type": ARROW_STREAM_MEDIA_TYPE},
+    )
+    assert response.status_code == 200
+    assert float(response.headers["X-Mean-Trees-Evaluated"]) <= 500
+
+    result = decode_arrow(response.content)
+    assert result["prediction"].tolist() == [1, 0]
+    assert result["probability"].isna().all()
+
+
+# ---------- WHAT-IF ----------
+def test_whatif_grid(features_churn):
+    grid = {"heure_supplementaires": [0, 1], "note_evaluation_actuelle": [2, 3, 4]}
+    response = client.post("/whatif", json={"features": features_churn, "grid": grid})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["columns"] == ["heure_supplementaires", "note_evaluation_actuelle"]
+    assert len(data["values"]) == len(data["probability"]) == len(data["prediction"]) == 6
+
+    expected = client.post("/predict", json={"features": features_churn}).json()
+    assert data["base_probability"] == pytest.approx(expected["probability"])
+
+    # Chaque variante est scorée comme un /predict équivalent (evolution_note recalculée)
+    variant = {**features_churn, "heure_supplementaires": 0, "note_evaluation_actuelle": 4}
+    variant["evolution_note"] = 4 - variant["note_evaluation_precedente"]
+    single = client.post("/predict", json={"features": variant}).json()
+    assert data["probability"][data["values"].index([0, 4])] == pytest.approx(single["probability"])
+
+
+def test_whatif_not_tracked_as_inference_latency(features_churn, monkeypatch):
+    tracker = LoadTracker()
+    monkeypatch.setattr(main, "load_tracker", tracker)
+
+    client.post("/whatif", json={"features": features_churn, "grid": {"heure_supplementaires": [0, 1]}})
+    assert tracker.snapshot()["samples"] == 0
+
+    client.post("/predict", json={"features": features_churn})
+    assert tracker.snapshot()["samples"] == 1
+
+
+def test_batch_routes_not_tracked_as_inference_latency(features_churn, monkeypatch):
+    tracker = LoadTracker()
+    monkeypatch.setattr(main, "load_tracker", tracker)
+
+    client.post("/predict/batch", json={"rows": [features_churn] * 3})
+    client.post(
+        "/predict/batch/columnar",
+        json={"columns": list(features_churn), "rows": [list(features_churn.values())]},
+    )
+    assert tracker.snapshot()["samples"] == 0
+
+
+def test_whatif_grid_linked_features(features_churn):
+    # Features non dérivables liées, modifiées ensemble dans chaque groupe
+    grid = {
+        "salaire": [
+            {"revenu_mensuel": r, "salaire_par_annee_exp": 12 * r} for r in (1500, 2200, 4000, 6000)
+        ],
+        "deplacement": [
+            {"frequence_deplacement": f, "distance_x_deplacement": 50 * f} for f in (0, 1, 2)
+        ],
+    }
+    response = client.post("/whatif", json={"features": features_churn, "grid": grid})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["columns"] == [
+        "revenu_mensuel", "salaire_par_annee_exp", "frequence_deplacement", "distance_x_deplacement"
+    ]
+    assert len(data["values"]) == len(data["probability"]) == 12
+
+    def probability(revenu, frequence):
+        return data["probability"][data["values"].index([revenu, 12 * revenu, frequence, 50 * frequence])]
+
+    # Chaque variante est scorée comme un /predict équivalent
+    variant = {
+        **features_churn,
+        "revenu_mensuel": 6000,
+        "salaire_par_annee_exp": 72000,
+        "frequence_deplacement": 0,
+        "distance_x_deplacement": 0,
+    }
+    single = client.post("/predict", json={"features": variant}).json()
+    assert probability(6000, 0) == pytest.approx(single["probability"])
+    assert probability(2200, 0) != probability(2200, 1)
+
+
+def test_whatif_overrides_raw(features_non_churn):
+    raw = _raw(features_non_churn)
+    overrides = [
+        {"revenu_mensuel": 4000, "salaire_par_annee_exp": 48000},
+        {"heure_supplementaires": 1},
+    ]
+
+    response = client.post("/whatif", json={"features": raw, "raw": True, "overrides": overrides})
+    assert response.status_code == 200
+    assert response.json()["values"] == [[4000, 48000, 0], [5000, 60000, 1]]
+
+
+def test_whatif_invalid_requests(features_churn):
+    for body, message in (
+        ({"grid": {"inconnue": [1]}}, "inconnue"),
+        ({"overrides": [{"age": 10}]}, "Variante 0"),
+        ({"overrides": [{"age": [1]}]}, "non scalaire"),
+        ({"grid": {"age": list(range(20, 60)), "revenu_mensuel": list(range(1000, 2000, 30))}}, "maximum"),
+    ):
+        response = client.post("/whatif", json={"features": features_churn, **body})
+        assert response.status_code == 400
+        assert message in response.json()["detail"]
+
+
+# ---------- STATISTIQUES (AGRÉGATS) ----------
+def test_stats_from_rollups(features_churn, features_non_churn):
+    db = TestingSessionLocal()
+    try:
+        SqlBackend().save(db, [
+            prediction_record(features_churn, 1, 0.9),
+            prediction_record(features_non_churn, 0, 0.1),
+            prediction_record(features_churn, 1, None),
+        ])
+    finally:
+        db.close()
+
+    response = client.get("/stats", params={"dimension": "departement"})
+    assert response.status_code == 200
+
+    groups = {g["value"]: g for g in response.json()["groups"]}
+    churn = groups[features_churn["departement"]]
+    assert churn["count"] >= 2
+    assert len(churn["histogram"]) == 10
+
+    daily = client.get("/stats", params={"dimension": "poste", "daily": True}).json()
+    assert all(g["bucket"] is not None for g in daily["groups"])
+
+
+def test_stats_invalid_requests():
+    assert client.get("/stats", params={"dimension": "age"}).status_code == 400
+    response = client.get(
+        "/stats",
+        params={"dimension": "departement", "start": "2025-02-01", "end": "2025-01-01"},
+    )
+    assert response.status_code == 400
+
+
+# ---------- SCORES PAR EMPLOYEE_ID ----------
+def _insert_score(employee_id, features, model_version):
+    db = TestingSessionLocal()
+    try:
+        db.merge(EmployeeScore(
+            employee_id=employee_id,
+            features=features,
+            features_hash=features_hash(features),
+            model_version=model_version,
+            prediction=0,
+            probability=0.0,
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_score_served_from_index_after_predict(features_churn):
+    predicted = client.post(
+        "/predict", json={"features": features_churn, "employee_id": "E-001"}
+    ).json()
+
+    response = client.get("/scores/E-001")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["source"] == "index"
+    assert data["prediction"] == predicted["prediction"]
+    assert data["probability"] == pytest.approx(predicted["probability"])
+    assert data["model_version"] == get_model_version()
+
+
+def test_score_served_from_table(features_churn):
+    _insert_score("E-002", features_churn, get_model_version())
+    score_index.clear()
+
+    data = client.get("/scores/E-002").json()
+    assert data["source"] == "table"
+    assert data["probability"] == 0.0
+
+
+def test_stale_score_is_rescored_live(features_churn):
+    _insert_score("E-003", features_churn, "old-model")
+    score_index.clear()
+
+    data = client.get("/scores/E-003").json()
+    assert data["source"] == "live"
+    assert data["model_version"] == get_model_version()
+    assert data["prediction"] == 1
+
+    assert client.get("/scores/E-003").json()["source"] == "index"
+
+
+def test_unknown_employee_score():
+    response = client.get("/scores/inconnu")
+    assert response.status_code == 404
+
+
+def test_rescore_stale_updates_table(features_churn, features_non_churn):
+    _insert_score("E-010", features_churn, "old-model")
+    _insert_score("E-011", features_non_churn, get_model_version())
+
+    db = TestingSessionLocal()
+    try:
+        rescored = rescore_stale(db, get_model(), get_model_version(), batch_size=1)
+        assert rescored >= 1
+        assert db.get(EmployeeScore, "E-010").model_version == get_model_version()
+        assert db.get(EmployeeScore, "E-010").prediction == 1
+        # Entrée déjà à jour : inchangée
+        assert db.get(EmployeeScore, "E-011").probability == 0.0
+    finally:
+        db.close()
+
+
+def test_predict_batch_employee_ids_length(features_churn):
+    response = client.post(
+        "/predict/batch",
+        json={"rows": [features_churn], "employee_ids": ["A", "B"]},
+    )
+    assert response.status_code == 400
+
+
+def test_employee_id_too_long(features_churn):
+    response = client.post(
+        "/predict", json={"features": features_churn, "employee_id": "E" * 65}
+    )
+    assert response.status_code == 422
+
+    response = client.post(
+        "/predict/batch",
+        json={"rows": [features_churn], "employee_ids": ["E" * 65]},
+    )
+    assert response.status_code == 422
+
+
+# ---------- LIVENESS / READINESS ----------
+def test_health_live():
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+def test_health_ready_after_startup(monkeypatch):
+    # Latences indépendantes des tests précédents
+    monkeypatch.setattr(main, "load_tracker", LoadTracker())
+    monkeypatch.setattr(early_exit, "_scorer", None)
+    with TestClient(app) as started:
+        # Scorer "decision only" construit au démarrage, pas à la première requête
+        assert early_exit._scorer is not None
+        response = started.get("/health/ready")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["model"]["warm"] is True
+    assert data["database"]["reachable"] is True
+    assert {"inflight", "p50_ms", "p99_ms"} <= set(data["inference"])
+    assert 0 <= data["saturation"]
+
+
+def test_health_ready_recovers_after_latency_spike(monkeypatch):
+    now = [0.0]
+    tracker = LoadTracker(window_s=60, clock=lambda: now[0])
+    monkeypatch.setattr(main, "load_tracker", tracker)
+    monkeypatch.setitem(state, "model_warm", True)
+    tracker.start()
+    tracker.finish(1e6)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert "p99_latency_high" in response.json()["reasons"]
+
+    now[0] = 61.0
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["inference"]["p99_ms"] is None
+
+
+def test_health_ready_without_database_on_segment_log(monkeypatch):
+    monkeypatch.setattr(
+        main, "database_status", lambda db: {"reachable": False, "error": "OperationalError"}
+    )
+    monkeypatch.setattr(main, "load_tracker", LoadTracker())
+    monkeypatch.setitem(state, "model_warm", True)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["reasons"] == ["db_unreachable"]
+
+    # Journal local : /predict ne dépend pas de la base
+    monkeypatch.setattr(main, "PERSISTENCE_BACKEND", "segment_log")
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["database"]["reachable"] is False
+    assert data["database"]["required"] is False
+
+
+def test_health_ready_before_warmup():
+    state["model_warm"] = False
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert "model_not_warm" in response.json()["reasons"]
@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+
+from app.db.archive import ARCHIVE_COLUMNS, compact, iter_history, read_archives, read_history
+from app.db.models import ModelInput, ModelOutput
+
+
+def _insert(db, features, days_ago, probability):
+    created_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    model_input = ModelInput(features=features, created_at=created_at)
+    db.add(model_input)
+    db.flush()
+    db.add(ModelOutput(
+        input_id=model_input.id,
+        prediction=int(probability >= 0.5),
+        probability=probability,
+        created_at=created_at,
+    ))
+    db.commit()
+
+
+# ---------- COMPACTION ----------
+def test_compact_moves_old_rows_to_archives(db, valid_features, tmp_path):
+    for days_ago, probability in [(200, 0.1), (150, 0.9), (120, 0.4), (1, 0.7)]:
+        _insert(db, valid_features, days_ago, probability)
+
+    archived = compact(db, older_than_days=90, batch_size=2, archive_dir=str(tmp_path))
+
+    assert archived == 3
+    assert db.scalar(select(func.count(ModelInput.id))) == 1
+    assert db.scalar(select(func.count(ModelOutput.id))) == 1
+
+    partitions = sorted(os.listdir(tmp_path))
+    assert len(partitions) == 3
+    assert all(p.startswith("date=") for p in partitions)
+
+
+def test_archives_are_typed_columns(db, valid_features, tmp_path):
+    _insert(db, valid_features, 100, 0.2)
+    compact(db, older_than_days=90, archive_dir=str(tmp_path))
+
+    frame = read_archives(str(tmp_path))
+    assert list(frame.columns) == ARCHIVE_COLUMNS
+    assert frame["age"].tolist() == [35]
+    assert frame["departement"].dtype == "string"
+    assert frame["probability"].tolist() == [0.2]
+
+
+# ---------- LECTURE TRANSPARENTE ----------
+def test_read_history_merges_archives_and_live_rows(db, valid_features, tmp_path):
+    for days_ago, probability in [(200, 0.1), (100, 0.9), (1, 0.7)]:
+        _insert(db, valid_features, days_ago, probability)
+    compact(db, older_than_days=90, archive_dir=str(tmp_path))
+
+    history = read_history(db, archive_dir=str(tmp_path))
+    assert history["probability"].tolist() == [0.1, 0.9, 0.7]
+
+    start = datetime.now(timezone.utc) - timedelta(days=150)
+    recent = read_history(db, start=start, archive_dir=str(tmp_path))
+    assert recent["probability"].tolist() == [0.9, 0.7]
+
+
+def test_iter_history_yields_bounded_chunks(db, valid_features, tmp_path):
+    for days_ago, probability in [(200, 0.1), (100, 0.9), (3, 0.2), (2, 0.3), (1, 0.7)]:
+        _insert(db, valid_features, days_ago, probability)
+    compact(db, older_than_days=90, archive_dir=str(tmp_path))
+
+    chunks = list(iter_history(db, archive_dir=str(tmp_path), batch_size=2))
+    # Un morceau par fichier d'archive, puis des pages de 2 lignes vivantes
+    assert [len(chunk) for chunk in chunks] == [1, 1, 2, 1]
+    assert all(list(chunk.columns) == ARCHIVE_COLUMNS for chunk in chunks)
+    assert sorted(p for chunk in chunks for p in chunk["probability"]) == [0.1, 0.2, 0.3, 0.7, 0.9]
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from app.ml.early_exit import DecisionScorer, remaining_bounds
+
+
+# ---------- FIXTURE LOT DE FEATURES ----------
+@pytest.fixture
+def batch(make_batch):
+    return make_batch(500)
+
+
+# ---------- BORNES ----------
+def test_remaining_bounds_contain_raw_scores(model, batch):
+    booster = model.steps[-1][1].booster_
+    n_trees = booster.current_iteration()
+    minimum, maximum = remaining_bounds(booster, n_trees)
+
+    assert minimum.shape == maximum.shape == (n_trees + 1,)
+    assert minimum[-1] == maximum[-1] == 0
+
+    raw = booster.predict(model[:-1].transform(batch), raw_score=True)
+    assert (raw >= minimum[0]).all()
+    assert (raw <= maximum[0]).all()
+
+
+# ---------- DÉCISIONS ----------
+@pytest.mark.parametrize("block_size", [1, 25, 1000])
+def test_decisions_match_full_model(model, batch, block_size):
+    decisions, trees_evaluated = DecisionScorer(model, block_size).decide(batch)
+    expected = (model.predict_proba(batch)[:, 1] >= 0.5).astype(int)
+
+    np.testing.assert_array_equal(decisions, expected)
+    assert ((trees_evaluated >= 1) & (trees_evaluated <= 500)).all()
+
+
+def test_early_exit_skips_trees(model, batch):
+    _, trees_evaluated = DecisionScorer(model, 25).decide(batch)
+    assert trees_evaluated.mean() < 500
+
+
+def test_empty_batch(model, batch):
+    decisions, trees_evaluated = DecisionScorer(model).decide(batch.iloc[:0])
+    assert len(decisions) == len(trees_evaluated) == 0
+
+
+def test_rejects_non_lightgbm_model():
+    with pytest.raises(ValueError):
+        DecisionScorer(object())
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from datetime import datetime, timezone
+
+from app.db.models import ModelInput
+from app.ml.features import (
+    BASE_FEATURES,
+    DERIVED_DEPENDENCIES,
+    DERIVED_FEATURES,
+    EXPECTED_FEATURES,
+    dependent_features,
+    derive_features,
+)
+
+
+# ---------- FIXTURE FEATURES DE BASE ----------
+@pytest.fixture
+def base_features(valid_features):
+    return {k: v for k, v in valid_features.items() if k not in DERIVED_FEATURES}
+
+
+def test_base_and_derived_cover_expected_features():
+    assert sorted(BASE_FEATURES + DERIVED_FEATURES) == sorted(EXPECTED_FEATURES)
+
+
+def test_derive_features_values(base_features):
+    base_features["note_evaluation_actuelle"] = 3
+    base_features["note_evaluation_precedente"] = 4
+    base_features["satisfaction_employee_environnement"] = 2
+    base_features["satisfaction_employee_equipe"] = 4
+    row = derive_features(pd.DataFrame([base_features])).iloc[0]
+
+    assert row["annee_derniere_promotion"] == datetime.now(timezone.utc).year - 2
+    assert row["evolution_note"] == -1
+    assert row["satisfaction_moyenne"] == 3
+
+
+def test_derive_features_reproduce_reference_payload(valid_features, base_features):
+    # Parité sur la charge utile complète non modifiée
+    row = derive_features(pd.DataFrame([base_features])).iloc[0]
+    for feature in DERIVED_FEATURES:
+        assert row[feature] == valid_features[feature], feature
+
+
+def test_derived_features_pass_orm_validation(base_features):
+    frame = derive_features(pd.DataFrame([base_features]))
+    features = frame[EXPECTED_FEATURES].to_dict("records")[0]
+    ModelInput(features=features)
+
+
+def test_derived_dependencies_match_derive_features(base_features):
+    assert sorted(DERIVED_DEPENDENCIES) == sorted(DERIVED_FEATURES)
+
+    reference = derive_features(pd.DataFrame([base_features])).iloc[0]
+    for feature, value in base_features.items():
+        if isinstance(value, str):
+            continue
+        changed = derive_features(pd.DataFrame([{**base_features, feature: value + 1}])).iloc[0]
+        affected = [f for f in DERIVED_FEATURES if changed[f] != reference[f]]
+        assert set(affected) <= set(dependent_features([feature])), feature
+
+
+def test_dependent_features():
+    assert dependent_features(["note_evaluation_actuelle"]) == ["evolution_note"]
+    assert dependent_features(["revenu_mensuel", "heure_supplementaires"]) == []
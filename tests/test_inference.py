@@ -0,0 +1,80 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from app.ml import inference
+from app.ml.inference import (
+    ProcessPoolBackend,
+    available_cpus,
+    decode_frame,
+    encode_frame,
+    predict_positive_proba,
+)
+
+
+# ---------- ENCODAGE ----------
+def test_encode_decode_roundtrip(batch):
+    matrix, categories = encode_frame(batch)
+    assert matrix.dtype == np.float64
+    assert set(categories) == {
+        list(batch.columns).index(c)
+        for c in ["statut_marital", "departement", "poste", "domaine_etude"]
+    }
+
+    decoded = decode_frame(matrix, list(batch.columns), categories)
+    for column in batch.columns:
+        assert list(decoded[column]) == list(batch[column])
+
+
+# ---------- BACKEND PROCESS POOL ----------
+def test_process_pool_matches_in_process(model, batch):
+    backend = ProcessPoolBackend(workers=2, min_chunk=10)
+    try:
+        pooled = backend.predict_proba(batch)
+    finally:
+        backend.close()
+
+    expected = model.predict_proba(batch)[:, 1]
+    np.testing.assert_allclose(pooled, expected)
+
+
+def test_small_batch_stays_in_process(model, batch):
+    probabilities = predict_positive_proba(model, batch.head(3))
+    np.testing.assert_allclose(probabilities, model.predict_proba(batch.head(3))[:, 1])
+
+
+def test_empty_batch_skips_model(model, batch):
+    assert predict_positive_proba(model, batch.head(0)).tolist() == []
+
+
+def test_broken_pool_is_rebuilt(model, batch):
+    backend = ProcessPoolBackend(workers=1, min_chunk=10)
+    try:
+        # Simule un worker tué (OOM, segfault)
+        backend._get_executor().submit(os._exit, 1)
+        with pytest.raises(BrokenProcessPool):
+            backend.predict_proba(batch)
+
+        pooled = backend.predict_proba(batch)
+    finally:
+        backend.close()
+    np.testing.assert_allclose(pooled, model.predict_proba(batch)[:, 1])
+
+
+def test_broken_pool_falls_back_in_process(model, batch, monkeypatch):
+    class BrokenBackend:
+        def predict_proba(self, X):
+            raise BrokenProcessPool("worker mort")
+
+    monkeypatch.setattr(inference, "POOL_MIN_BATCH", 1)
+    monkeypatch.setattr(inference, "POOL_WORKERS", 2)
+    monkeypatch.setattr(inference, "get_pool_backend", BrokenBackend)
+
+    probabilities = predict_positive_proba(model, batch)
+    np.testing.assert_allclose(probabilities, model.predict_proba(batch)[:, 1])
+
+
+def test_available_cpus():
+    assert 1 <= available_cpus() <= (os.cpu_count() or 1)
@@ -0,0 +1,135 @@
+from app.monitoring import (
+    READY_MAX_INFLIGHT,
+    READY_MAX_P99_MS,
+    READY_MIN_POOL_HEADROOM,
+    LoadTracker,
+    database_status,
+    readiness,
+)
+
+
+DB_OK = {"reachable": True, "headroom": 5}
+
+
+# ---------- CHARGE ----------
+def test_load_tracker_snapshot():
+    tracker = LoadTracker(max_samples=100)
+    assert tracker.snapshot()["p99_ms"] is None
+
+    for ms in range(1, 101):
+        tracker.start()
+        tracker.finish(float(ms))
+    tracker.start()
+
+    load = tracker.snapshot()
+    assert load["inflight"] == 1
+    assert load["samples"] == 100
+    assert 50 <= load["p50_ms"] <= 51
+    assert load["p99_ms"] > 99
+
+
+def test_load_tracker_forgets_old_latencies():
+    now = [0.0]
+    tracker = LoadTracker(window_s=60, clock=lambda: now[0])
+
+    tracker.start()
+    tracker.finish(READY_MAX_P99_MS * 10)
+    assert tracker.snapshot()["p99_ms"] == READY_MAX_P99_MS * 10
+
+    # Pic sorti de la fenêtre : plus de mesure, la readiness se rétablit
+    now[0] = 61.0
+    load = tracker.snapshot()
+    assert load["samples"] == 0
+    assert load["p99_ms"] is None
+
+    tracker.start()
+    tracker.finish(5.0)
+    assert tracker.snapshot()["p99_ms"] == 5.0
+
+
+# ---------- BASE DE DONNÉES ----------
+class FakePool:
+    def __init__(self, size, checked_out):
+        self._size = size
+        self._checked_out = checked_out
+
+    def size(self):
+        return self._size
+
+    def checkedout(self):
+        return self._checked_out
+
+    def overflow(self):
+        return self._checked_out - self._size
+
+
+class FakeSession:
+    def __init__(self, pool):
+        self.pool = pool
+        self.probed = False
+
+    def get_bind(self):
+        return self
+
+    def execute(self, statement):
+        self.probed = True
+
+
+def test_database_status_probes_with_headroom():
+    db = FakeSession(FakePool(size=5, checked_out=2))
+    status = database_status(db, max_overflow=0)
+    assert db.probed is True
+    assert status["reachable"] is True
+    assert status["headroom"] == 3
+
+
+def test_database_status_skips_probe_when_pool_exhausted():
+    db = FakeSession(FakePool(size=5, checked_out=5 + 2 - READY_MIN_POOL_HEADROOM + 1))
+    status = database_status(db, max_overflow=2)
+    # Pas de sonde : elle bloquerait jusqu'à pool_timeout
+    assert db.probed is False
+    assert status["reachable"] is None
+
+    load = {"inflight": 0, "samples": 0, "p50_ms": None, "p99_ms": None}
+    assert readiness(True, status, load)["reasons"] == ["db_pool_exhausted"]
+
+
+# ---------- READINESS ----------
+def test_ready_when_all_checks_pass():
+    load = {"inflight": 0, "samples": 0, "p50_ms": None, "p99_ms": None}
+    result = readiness(True, DB_OK, load)
+    assert result["ready"] is True
+    assert result["reasons"] == []
+
+
+def test_not_ready_reasons():
+    load = {
+        "inflight": READY_MAX_INFLIGHT + 1,
+        "samples": 10,
+        "p50_ms": 1.0,
+        "p99_ms": READY_MAX_P99_MS * 2,
+    }
+    result = readiness(False, {"reachable": True, "headroom": 0}, load)
+
+    assert result["ready"] is False
+    assert set(result["reasons"]) == {
+        "model_not_warm",
+        "db_pool_exhausted",
+        "inference_queue_full",
+        "p99_latency_high",
+    }
+    assert result["saturation"] == 2.0
+
+
+def test_not_ready_when_db_unreachable():
+    load = {"inflight": 0, "samples": 0, "p50_ms": None, "p99_ms": None}
+    result = readiness(True, {"reachable": False}, load)
+    assert result["reasons"] == ["db_unreachable"]
+
+
+def test_db_not_required_with_segment_log():
+    load = {"inflight": 0, "samples": 0, "p50_ms": None, "p99_ms": None}
+    for db_status in ({"reachable": False}, {"reachable": None, "headroom": 0}):
+        result = readiness(True, db_status, load, db_required=False)
+        assert result["ready"] is True
+        assert result["reasons"] == []
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+
+from app.db.models import EmployeeScore, ModelInput, ModelOutput, ReplayedSegment
+from app.db.persistence import (
+    SegmentLogBackend,
+    SqlBackend,
+    prediction_record,
+    read_segment,
+    replay_segments,
+)
+
+
+def _segments(directory, suffix=".log"):
+    return sorted(f for f in os.listdir(directory) if f.endswith(suffix))
+
+
+# ---------- JOURNAL DE SEGMENTS ----------
+def test_segment_log_group_commit_from_threads(valid_features, tmp_path):
+    backend = SegmentLogBackend(str(tmp_path), group_commit_ms=1)
+
+    def write(worker):
+        for i in range(20):
+            backend.save(None, [prediction_record(valid_features, 0, i / 100, f"{worker}-{i}")])
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    backend.close()
+
+    records = [r for name in _segments(tmp_path) for r in read_segment(os.path.join(tmp_path, name))]
+    assert len(records) == 80
+    assert {r["employee_id"] for r in records} == {f"{w}-{i}" for w in range(4) for i in range(20)}
+    assert _segments(tmp_path, ".open") == []
+
+
+def test_segment_log_rotates_by_size(valid_features, tmp_path):
+    backend = SegmentLogBackend(str(tmp_path), max_bytes=1, group_commit_ms=0)
+    for i in range(3):
+        backend.save(None, [prediction_record(valid_features, 1, 0.9)])
+    backend.close()
+
+    assert len(_segments(tmp_path)) == 3
+
+
+def test_segment_log_rejects_invalid_features(valid_features, tmp_path):
+    backend = SegmentLogBackend(str(tmp_path))
+    valid_features["age"] = 10
+    with pytest.raises(ValueError, match="age hors plage"):
+        backend.save(None, [prediction_record(valid_features, 0, 0.1)])
+    backend.close()
+
+    assert _segments(tmp_path) == []
+
+
+def test_read_segment_ignores_truncated_tail(valid_features, tmp_path):
+    path = tmp_path / "segment.log"
+    record = prediction_record(valid_features, 0, 0.1)
+    path.write_text(f"{json.dumps(record)}\n{{\"created_at\": ")
+
+    assert len(read_segment(str(path))) == 1
+
+
+# ---------- REJEU ----------
+def test_replay_segments_loads_database(db, valid_features, tmp_path):
+    created_at = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    backend = SegmentLogBackend(str(tmp_path), group_commit_ms=0)
+    backend.save(None, [
+        {**prediction_record(valid_features, 1, 0.8, "E-1", "v1"), "created_at": created_at.isoformat()},
+        prediction_record(valid_features, 0, 0.2),
+    ])
+    backend.close()
+
+    loaded = replay_segments(db, str(tmp_path), batch_size=1)
+
+    assert loaded == 2
+    assert _segments(tmp_path) == []
+    assert db.scalar(select(func.count(ModelInput.id))) == 2
+    assert db.scalar(select(func.count(ModelOutput.id))) == 2
+    assert db.scalar(select(func.min(ModelInput.created_at))) == created_at.replace(tzinfo=None)
+    assert db.get(EmployeeScore, "E-1").probability == 0.8
+
+
+def _write_segment(directory, name, records):
+    with open(os.path.join(directory, name), "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_replay_failure_leaves_segment_for_retry(db, valid_features, tmp_path, monkeypatch):
+    _write_segment(tmp_path, "segment-1.log", [prediction_record(valid_features, 0, 0.1)] * 3)
+
+    save = SqlBackend.save
+    calls = []
+
+    def failing_save(self, db, records, commit=True):
+        calls.append(len(records))
+        if len(calls) == 2:
+            raise OperationalError("INSERT", {}, Exception("connexion perdue"))
+        save(self, db, records, commit)
+
+    monkeypatch.setattr(SqlBackend, "save", failing_save)
+    with pytest.raises(OperationalError):
+        replay_segments(db, str(tmp_path), batch_size=1)
+
+    # Première tranche annulée avec le reste du segment
+    assert db.scalar(select(func.count(ModelInput.id))) == 0
+    assert _segments(tmp_path) == ["segment-1.log"]
+
+    monkeypatch.setattr(SqlBackend, "save", save)
+    assert replay_segments(db, str(tmp_path), batch_size=1) == 3
+    assert db.scalar(select(func.count(ModelInput.id))) == 3
+
+
+def test_replay_skips_segment_already_loaded(db, valid_features, tmp_path):
+    records = [prediction_record(valid_features, 0, 0.1)] * 2
+    _write_segment(tmp_path, "segment-1.log", records)
+    assert replay_segments(db, str(tmp_path)) == 2
+
+    # Arrêt entre le commit et la suppression : le segment est toujours là
+    _write_segment(tmp_path, "segment-1.log", records)
+    assert replay_segments(db, str(tmp_path)) == 0
+
+    assert _segments(tmp_path) == []
+    assert db.scalar(select(func.count(ModelInput.id))) == 2
+    assert db.get(ReplayedSegment, "segment-1.log").records == 2
+
+
+def test_replay_moves_unloadable_records_to_dead_letter(db, valid_features, tmp_path):
+    invalid = dict(valid_features, age=10)
+    _write_segment(tmp_path, "segment-1.log", [
+        prediction_record(valid_features, 0, 0.1),
+        prediction_record(invalid, 0, 0.1),
+        # Refusé par la base (check_prediction_binary)
+        prediction_record(valid_features, 2, 0.1),
+        prediction_record(valid_features, 1, 0.9),
+    ])
+
+    assert replay_segments(db, str(tmp_path), batch_size=10) == 2
+    assert _segments(tmp_path) == []
+    assert db.scalar(select(func.count(ModelOutput.id))) == 2
+    assert db.get(ReplayedSegment, "segment-1.log").rejected == 2
+
+    dead = [json.loads(line) for line in (tmp_path / "segment-1.dead").read_text().splitlines()]
+    assert [d["record"]["features"]["age"] for d in dead] == [10, valid_features["age"]]
+    assert "age hors plage" in dead[0]["error"]
+    assert "IntegrityError" in dead[1]["error"]
+
+
+# ---------- BACKEND SQL ----------
+def test_sql_backend_saves_records(db, valid_features):
+    SqlBackend().save(db, [prediction_record(valid_features, 1, 0.7, "E-2", "v1")])
+
+    output = db.scalars(select(ModelOutput)).one()
+    assert output.probability == 0.7
+    assert output.input.features["age"] == 35
+    assert db.get(EmployeeScore, "E-2").model_version == "v1"
+
+
+def test_sql_backend_commits_once(db, valid_features):
+    # Commits effectifs de la connexion (les savepoints ne comptent pas)
+    commits = []
+    engine = db.get_bind()
+
+    def listener(connection):
+        commits.append(connection)
+
+    event.listen(engine, "commit", listener)
+
+    SqlBackend().save(db, [
+        prediction_record(valid_features, 1, 0.7, "E-3", "v1"),
+        prediction_record(valid_features, 0, 0.2, "E-4", "v2"),
+    ])
+
+    event.remove(engine, "commit", listener)
+
+    assert len(commits) == 1
+    assert db.get(EmployeeScore, "E-4").model_version == "v2"
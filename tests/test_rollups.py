@@ -0,0 +1,137 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select
+
+from app.db import archive
+from app.db.archive import compact
+from app.db.models import PredictionRollup
+from app.db.persistence import SqlBackend, prediction_record
+from app.db.rollups import ALL_TIME_BUCKET, aggregate, read_rollups, rebuild_rollups, update_rollups
+
+
+def _record(features, prediction, probability, days_ago=0, **overrides):
+    record = prediction_record({**features, **overrides}, prediction, probability)
+    created_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    record["created_at"] = created_at.isoformat()
+    return record
+
+
+def _rollups(db):
+    return {
+        (r.dimension, r.value, r.bucket): (r.count, r.positives, r.scored, round(r.probability_sum, 9), r.histogram)
+        for r in db.scalars(select(PredictionRollup))
+    }
+
+
+# ---------- AGRÉGATION ----------
+def test_aggregate_counts_and_histogram(valid_features):
+    records = [
+        _record(valid_features, 1, 0.95),
+        _record(valid_features, 0, 0.05),
+        _record(valid_features, 1, None),
+        _record(valid_features, 0, 0.42, departement="RH"),
+    ]
+    groups = aggregate(records, ["departement"])
+    today = datetime.now(timezone.utc).date()
+
+    it = groups[("departement", "IT", today)]
+    assert it["count"] == 3
+    assert it["positives"] == 2
+    # Probabilité None (mode "decision only") : comptée, mais hors moyenne
+    assert it["scored"] == 2
+    assert it["probability_sum"] == pytest.approx(1.0)
+    assert it["histogram"] == [1, 0, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert groups[("departement", "RH", today)]["histogram"][4] == 1
+
+
+def test_probability_one_in_last_bin(valid_features):
+    groups = aggregate([_record(valid_features, 1, 1.0)], ["poste"])
+    assert list(groups.values())[0]["histogram"][-1] == 1
+
+
+# ---------- MISE À JOUR INCRÉMENTALE ----------
+def test_incremental_updates_match_single_batch(db, valid_features):
+    records = [
+        _record(valid_features, i % 2, i / 10, days_ago=i % 3, poste=f"P{i % 4}")
+        for i in range(10)
+    ]
+    for start in range(0, 10, 3):
+        update_rollups(db, records[start:start + 3])
+    db.commit()
+    incremental = _rollups(db)
+
+    db.query(PredictionRollup).delete()
+    update_rollups(db, records)
+    db.commit()
+    assert _rollups(db) == incremental
+
+
+def test_sql_backend_updates_rollups(db, valid_features):
+    SqlBackend().save(db, [_record(valid_features, 1, 0.8), _record(valid_features, 0, 0.2)])
+    SqlBackend().save(db, [_record(valid_features, 1, None)])
+
+    groups = read_rollups(db, "departement")
+    assert len(groups) == 1
+    assert groups[0]["value"] == "IT"
+    assert groups[0]["count"] == 3
+    assert groups[0]["churn_rate"] == pytest.approx(2 / 3)
+    assert groups[0]["mean_probability"] == pytest.approx(0.5)
+
+
+# ---------- LECTURE ----------
+def test_read_rollups_range_and_daily(db, valid_features):
+    update_rollups(db, [_record(valid_features, 1, 0.9, days_ago=d) for d in range(5)])
+    db.commit()
+    today = datetime.now(timezone.utc).date()
+
+    total = read_rollups(db, "departement")
+    assert total[0]["count"] == 5 and total[0]["bucket"] is None
+
+    recent = read_rollups(db, "departement", start=today - timedelta(days=1), end=today)
+    assert recent[0]["count"] == 2
+
+    daily = read_rollups(db, "departement", daily=True)
+    assert [g["bucket"] for g in daily] == sorted(today - timedelta(days=d) for d in range(5))
+    assert read_rollups(db, "departement", start=date(2000, 1, 1), end=date(2000, 1, 2)) == []
+    assert read_rollups(db, "departement", end=today - timedelta(days=3))[0]["count"] == 2
+
+
+def test_read_rollups_all_time_reads_single_row(db, valid_features):
+    update_rollups(db, [_record(valid_features, d % 2, 0.5, days_ago=d) for d in range(30)])
+    db.commit()
+    total = read_rollups(db, "departement")
+
+    # Sans bornes : seule la ligne "tout l'historique" est lue
+    db.query(PredictionRollup).filter(PredictionRollup.bucket != ALL_TIME_BUCKET).delete()
+    db.commit()
+    assert read_rollups(db, "departement") == total
+    assert total[0]["count"] == 30
+    assert total[0]["positives"] == 15
+
+
+# ---------- RECONSTRUCTION ----------
+def test_rebuild_includes_archived_history(db, valid_features, tmp_path):
+    records = [_record(valid_features, i % 2, i / 10, days_ago=200 * (i % 2)) for i in range(6)]
+    SqlBackend().save(db, records)
+    expected = _rollups(db)
+
+    compact(db, older_than_days=90, archive_dir=str(tmp_path))
+    db.query(PredictionRollup).delete()
+    db.commit()
+
+    assert rebuild_rollups(db, archive_dir=str(tmp_path)) == 6
+    assert _rollups(db) == expected
+
+
+def test_rebuild_streams_history(db, valid_features, tmp_path, monkeypatch):
+    records = [_record(valid_features, i % 2, i / 10, days_ago=200 * (i % 2), poste=f"P{i % 3}") for i in range(9)]
+    SqlBackend().save(db, records)
+    expected = _rollups(db)
+    compact(db, older_than_days=90, archive_dir=str(tmp_path))
+
+    def read_history(*args, **kwargs):
+        raise AssertionError("historique chargé en entier")
+
+    monkeypatch.setattr(archive, "read_history", read_history)
+    assert rebuild_rollups(db, archive_dir=str(tmp_path), batch_size=2) == 9
+    assert _rollups(db) == expected
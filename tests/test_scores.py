@@ -0,0 +1,20 @@
+from app.db.scores import ScoreIndex, features_hash
+
+
+# ---------- EMPREINTE DES FEATURES ----------
+def test_features_hash_ignores_key_order():
+    assert features_hash({"a": 1, "b": "x"}) == features_hash({"b": "x", "a": 1})
+    assert features_hash({"a": 1}) != features_hash({"a": 2})
+
+
+# ---------- INDEX MÉMOIRE ----------
+def test_score_index_evicts_least_recently_used():
+    index = ScoreIndex(max_entries=2)
+    index.put("a", {"probability": 0.1})
+    index.put("b", {"probability": 0.2})
+    index.get("a")
+    index.put("c", {"probability": 0.3})
+
+    assert len(index) == 2
+    assert index.get("b") is None
+    assert index.get("a") == {"probability": 0.1}
@@ -0,0 +1,28 @@
+import json
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ["pandas", "sklearn", "lightgbm", "joblib", "pyarrow", "psycopg2", "psycopg"]
+
+
+# ---------- IMPORT DIFFÉRÉ ----------
+def test_import_app_is_lazy():
+    code = (
+        "import json, sys\n"
+        "import app.main\n"
+        "from app.db import session\n"
+        "from app.ml import model\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'heavy': heavy, 'engine': session._engine is not None,"
+        " 'model': model._model is not None}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    state = json.loads(result.stdout.splitlines()[-1])
+
+    assert state == {"heavy": [], "engine": False, "model": False}
@@ -0,0 +1,111 @@
+import pytest
+
+from app.ml.features import EXPECTED_FEATURES
+from app.ml.whatif import build_variants, validate_variants, variant_values
+
+
+# ---------- FIXTURE FEATURES COMPLÈTES ----------
+@pytest.fixture
+def base():
+    features = {feature: 1 for feature in EXPECTED_FEATURES}
+    features.update({
+        "statut_marital": "Marié(e)",
+        "domaine_etude": "Autre",
+        "departement": "Consulting",
+        "poste": "Consultant",
+        "revenu_mensuel": 3000,
+        "frequence_deplacement": 1,
+        "note_evaluation_actuelle": 3,
+        "note_evaluation_precedente": 3,
+        "evolution_note": 0,
+        # Features non dérivables : valeurs du client, jamais recalculées
+        "salaire_par_annee_exp": 36000,
+        "distance_x_deplacement": 10,
+    })
+    return features
+
+
+# ---------- ÉNUMÉRATION ----------
+def test_grid_is_cartesian_product(base):
+    columns, values = variant_values(base, grid={"revenu_mensuel": [2000, 4000], "frequence_deplacement": [0, 1, 2]})
+    assert columns == ["revenu_mensuel", "frequence_deplacement"]
+    assert len(values) == 6
+    assert values[0] == [2000, 0] and values[-1] == [4000, 2]
+
+
+def test_grid_linked_entries_vary_together(base):
+    grid = {
+        "salaire": [{"revenu_mensuel": 2000, "salaire_par_annee_exp": 24000}, {"revenu_mensuel": 4000}],
+        "heure_supplementaires": [0, 1],
+    }
+    columns, values = variant_values(base, grid=grid)
+    assert columns == ["revenu_mensuel", "salaire_par_annee_exp", "heure_supplementaires"]
+    # Feature absente d'un groupe : valeur de base
+    assert values == [[2000, 24000, 0], [2000, 24000, 1], [4000, 36000, 0], [4000, 36000, 1]]
+
+
+def test_overrides_keep_base_values(base):
+    columns, values = variant_values(base, overrides=[{"revenu_mensuel": 5000}, {"heure_supplementaires": 0}])
+    assert columns == ["revenu_mensuel", "heure_supplementaires"]
+    assert values == [[5000, 1], [3000, 0]]
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({}, "grid"),
+        ({"grid": {"inconnue": [1]}}, "inconnue"),
+        ({"grid": {"evolution_note": [1]}}, "dérivée"),
+        ({"grid": {"g": [{"evolution_note": 1}]}}, "dérivée"),
+        ({"grid": {"revenu_mensuel": [1], "g": [{"revenu_mensuel": 2}]}}, "plusieurs"),
+        ({"grid": {"g": [{"revenu_mensuel": 2}, 3]}}, "mélangés"),
+        ({"overrides": [{"age": [1]}]}, "non scalaire"),
+        ({"grid": {"age": [{"a": 1}, 30]}}, "mélangés"),
+        ({"grid": {"g": [{"age": {"a": 1}}]}}, "non scalaire"),
+        ({"grid": {"revenu_mensuel": list(range(30)), "genre": [0, 1]}, "max_variants": 50}, "maximum"),
+        ({"overrides": [{"age": 30}] * 3, "max_variants": 2}, "maximum"),
+    ],
+)
+def test_invalid_requests(base, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        variant_values(base, **kwargs)
+
+
+# ---------- CONSTRUCTION DU LOT ----------
+def test_build_variants_rederives_dependent_features(base):
+    columns, values = variant_values(base, grid={"note_evaluation_actuelle": [2, 5], "revenu_mensuel": [4000]})
+    frame = build_variants(base, columns, values, EXPECTED_FEATURES)
+
+    assert len(frame) == 3
+    assert list(frame.columns) == EXPECTED_FEATURES
+    # Ligne de base inchangée
+    assert frame.iloc[0]["evolution_note"] == 0
+    assert frame["evolution_note"].tolist()[1:] == [-1, 2]
+    # Feature non dérivable : valeur de base conservée
+    assert (frame["salaire_par_annee_exp"] == 36000).all()
+
+
+# ---------- VALIDATION ----------
+def test_validate_variants_reports_variant_index(valid_features):
+    columns, values = variant_values(valid_features, overrides=[{"age": 40}, {"age": 40}, {"age": 10}])
+    frame = build_variants(valid_features, columns, values, EXPECTED_FEATURES)
+
+    with pytest.raises(ValueError, match="Variante 2 : age hors plage"):
+        validate_variants(valid_features, columns, frame)
+
+
+def test_validate_variants_checks_rederived_features(valid_features):
+    columns, values = variant_values(valid_features, grid={"note_evaluation_actuelle": [1, 2, 3, 4, 5]})
+    frame = build_variants(valid_features, columns, values, EXPECTED_FEATURES)
+
+    # evolution_note recalculée : cohérente avec chaque note
+    validate_variants(valid_features, columns, frame)
+
+
+def test_validate_variants_rejects_invalid_base(valid_features):
+    valid_features["age"] = 10
+    columns, values = variant_values(valid_features, overrides=[{"heure_supplementaires": 0}])
+    frame = build_variants(valid_features, columns, values, EXPECTED_FEATURES)
+
+    with pytest.raises(ValueError, match="^age hors plage"):
+        validate_variants(valid_features, columns, frame)